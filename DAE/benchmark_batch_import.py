@@ -0,0 +1,156 @@
+# Headless benchmark for the DAE batch importer, run it with:
+#   blender -b --factory-startup --python DAE/benchmark_batch_import.py -- --counts 10 50 100 200 --output bench.json
+# Writes synthetic DAE files, imports growing batches of them with every import
+# mode, with and without fast batch, and reports the time per file as JSON.
+# With fast batch the time per file should stay flat as the batch grows.
+import bpy
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import io_batch_import_dae_collection_release as batch_import
+
+MODES = ("BUILTIN", "NATIVE", "PARALLEL")
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark the DAE batch importer")
+    parser.add_argument("--counts", type=int, nargs="+", default=[10, 50, 100, 200], help="Batch sizes to import")
+    parser.add_argument("--objects", type=int, default=20, help="Objects per DAE file")
+    parser.add_argument("--triangles", type=int, default=200, help="Triangles per object")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Import modes to run")
+    parser.add_argument("--output", default="", help="JSON file to write, printed to stdout when empty")
+    return parser.parse_args(argv)
+
+def grid_arrays(triangle_count):
+    # Positions and triangle corners of a square grid with at least triangle_count triangles
+    side = max(1, int((max(triangle_count, 2) / 2) ** 0.5 + 0.999))
+    positions = [(x / side, y / side, 0.0) for y in range(side + 1) for x in range(side + 1)]
+    triangles = []
+    row = side + 1
+    for y in range(side):
+        for x in range(side):
+            corner = y * row + x
+            triangles.append((corner, corner + 1, corner + row + 1))
+            triangles.append((corner, corner + row + 1, corner + row))
+    return positions, triangles
+
+def write_dae(file_path, name, object_count, triangle_count):
+    # One grid geometry with a material, instanced by object_count nodes in a row
+    positions, triangles = grid_arrays(triangle_count)
+    position_text = " ".join(f"{v:.4f}" for p in positions for v in p)
+    uv_text = " ".join(f"{v:.4f}" for p in positions for v in p[:2])
+    # VERTEX, NORMAL and TEXCOORD share offset 0, the normal source has one entry per vertex
+    normal_text = " ".join("0 0 1" for _ in positions)
+    corner_text = " ".join(str(i) for triangle in triangles for i in triangle)
+    nodes = "\n".join(
+        f'<node id="{name}_{i}" name="{name}_{i}"><translate>{i * 1.5} 0 0</translate>'
+        f'<instance_geometry url="#{name}_mesh"><bind_material><technique_common>'
+        f'<instance_material symbol="mat" target="#{name}_material"/></technique_common></bind_material>'
+        f'</instance_geometry></node>'
+        for i in range(object_count)
+    )
+    with open(file_path, "w") as f:
+        f.write(f"""<?xml version="1.0" encoding="utf-8"?>
+<COLLADA xmlns="http://www.collada.org/2005/11/COLLADASchema" version="1.4.1">
+<asset><unit name="meter" meter="1"/><up_axis>Z_UP</up_axis></asset>
+<library_effects><effect id="{name}_effect"><profile_COMMON><technique sid="common"><lambert>
+<diffuse><color>0.8 0.8 0.8 1</color></diffuse></lambert></technique></profile_COMMON></effect></library_effects>
+<library_materials><material id="{name}_material" name="{name}_material"><instance_effect url="#{name}_effect"/></material></library_materials>
+<library_geometries><geometry id="{name}_mesh" name="{name}_mesh"><mesh>
+<source id="{name}_positions"><float_array id="{name}_positions_array" count="{len(positions) * 3}">{position_text}</float_array>
+<technique_common><accessor source="#{name}_positions_array" count="{len(positions)}" stride="3">
+<param name="X" type="float"/><param name="Y" type="float"/><param name="Z" type="float"/></accessor></technique_common></source>
+<source id="{name}_normals"><float_array id="{name}_normals_array" count="{len(positions) * 3}">{normal_text}</float_array>
+<technique_common><accessor source="#{name}_normals_array" count="{len(positions)}" stride="3">
+<param name="X" type="float"/><param name="Y" type="float"/><param name="Z" type="float"/></accessor></technique_common></source>
+<source id="{name}_uvs"><float_array id="{name}_uvs_array" count="{len(positions) * 2}">{uv_text}</float_array>
+<technique_common><accessor source="#{name}_uvs_array" count="{len(positions)}" stride="2">
+<param name="S" type="float"/><param name="T" type="float"/></accessor></technique_common></source>
+<vertices id="{name}_vertices"><input semantic="POSITION" source="#{name}_positions"/></vertices>
+<triangles material="mat" count="{len(triangles)}">
+<input semantic="VERTEX" source="#{name}_vertices" offset="0"/>
+<input semantic="NORMAL" source="#{name}_normals" offset="0"/>
+<input semantic="TEXCOORD" source="#{name}_uvs" offset="0" set="0"/>
+<p>{corner_text}</p></triangles>
+</mesh></geometry></library_geometries>
+<library_visual_scenes><visual_scene id="scene" name="scene">
+{nodes}
+</visual_scene></library_visual_scenes>
+<scene><instance_visual_scene url="#scene"/></scene>
+</COLLADA>
+""")
+
+def clear_scene():
+    # Remove everything an earlier run imported
+    ids = [*bpy.data.objects, *bpy.data.meshes, *bpy.data.materials, *bpy.data.images, *bpy.data.collections]
+    bpy.data.batch_remove(ids)
+
+def run_import(folder_path, file_names, mode, fast_batch):
+    # Import one batch and time it, the scene starts empty
+    clear_scene()
+    start = time.perf_counter()
+    result = bpy.ops.import_test.some_data(
+        filepath=os.path.join(folder_path, file_names[0]),
+        files=[{"name": name} for name in file_names],
+        prop_import_mode=mode,
+        prop_fast_batch=fast_batch,
+        prop_import_as_collection=True,
+        prop_use_cache=False,
+    )
+    seconds = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "fast_batch": fast_batch,
+        "files": len(file_names),
+        "ok": result == {'FINISHED'},
+        "seconds": seconds,
+        "ms_per_file": seconds / len(file_names) * 1000,
+        "objects": len(bpy.data.objects),
+    }
+
+def main():
+    args = parse_args()
+    batch_import.register()
+
+    modes = [mode for mode in args.modes if mode != "BUILTIN" or batch_import.collada_importer_available()]
+    report = {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="batch_import_bench_") as folder_path:
+        file_names = []
+        start = time.perf_counter()
+        for index in range(max(args.counts)):
+            name = f"bench_{index:04d}"
+            write_dae(os.path.join(folder_path, name + ".dae"), name, args.objects, args.triangles)
+            file_names.append(name + ".dae")
+        report["write_seconds"] = time.perf_counter() - start
+
+        for mode in modes:
+            # Fast batch only changes how the built-in importer runs
+            for fast_batch in ((False, True) if mode == "BUILTIN" else (False,)):
+                for count in sorted(args.counts):
+                    run = run_import(folder_path, file_names[:count], mode, fast_batch)
+                    report["runs"].append(run)
+                    label = f"{mode}{' fast' if fast_batch else ''}"
+                    print(f"{label:>13} {count:5d} files: {run['seconds']:8.2f}s ({run['ms_per_file']:.1f} ms/file)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote {args.output}")
+    else:
+        print(json.dumps(report, indent=1))
+
+main()
@@ -11,63 +11,1361 @@ bl_info = {
     "category": "Import-Export"}
 
 import bpy
+import os
+import sys
+import json
+import time
+import struct
+import hashlib
+import tempfile
+import subprocess
+import numpy as np
+import xml.etree.ElementTree as ET
+from types import SimpleNamespace
 from pathlib import Path
+from urllib.parse import unquote
+from mathutils import Matrix
 
 # ImportHelper is a helper class, defines filename and
 # invoke() function which calls the file selector.
 from bpy_extras.io_utils import ImportHelper
-from bpy.props import StringProperty, BoolProperty, EnumProperty, CollectionProperty
+from bpy.props import StringProperty, BoolProperty, EnumProperty, IntProperty, FloatProperty, CollectionProperty
 from bpy.types import Operator, PropertyGroup
 
-def read_some_data(self, context, filepath, use_some_setting, import_as_collection):
+# Command line flag used to run this file as a background DAE parse worker
+PARSE_WORKER_FLAG = "--dae-parse-worker"
+
+# Import cache: .blend libraries of earlier imports and the index of the hashed files
+CACHE_FOLDER = "dae_import_cache"
+CACHE_INDEX_NAME = "index.json"
+CACHE_VERSION = 1
+
+# Custom properties of proxy objects and of the meshes and materials proxy loading makes
+PROXY_SOURCE_PROPERTY = "dae_source"
+PROXY_GEOMETRY_PROPERTY = "dae_geometry"
+PROXY_BINDINGS_PROPERTY = "dae_bindings"
+PROXY_BOUNDS_PROPERTY = "dae_bounds"
+PROXY_MATERIAL_PROPERTY = "dae_material"
+PROXY_BOX_PROPERTY = "dae_proxy_box"
+
+# Scene property holding modification time and size of every file imported by folder import
+FOLDER_INDEX_PROPERTY = "dae_folder_index"
+# Object property holding the DAE file an object was imported from
+IMPORT_SOURCE_PROPERTY = "dae_import_source"
+# Files modified more recently than this may still be being written and wait for the next scan
+FOLDER_SETTLE_SECONDS = 2.0
+
+def read_some_data(self, context, file_paths, import_as_collection, cache=None, images=None, fast_batch=False,
+                   failed=None):
+    # Import DAE files one after another with Blender's COLLADA importer, one collection per file
     print("running read_some_data...")
-    folder = Path(filepath)
+    view_layer = bpy.context.view_layer
+    active_layer_collection = view_layer.active_layer_collection
+    # Fast batch: exclude state before the batch of every collection taken out of the view layer
+    excluded = {}
 
-    for selection in self.files:
-        fp = Path(folder.parent, selection.name)
+    # Resolve layer collections through one index for the whole batch, nested ones included
+    layer_collections = build_layer_collection_index(view_layer)
 
-        # Check if a collection with the same name already exists
-        collection_name = selection.name.split('.')[0]
-        existing_collection = bpy.data.collections.get(collection_name)
+    for fp in file_paths:
+        # Reuse the collection of the same name or create a new one, and make it active
+        collection_name = os.path.basename(fp).split('.')[0]
+        collection = get_import_collection(context, collection_name)
+        layer_collection = layer_collections.get(collection.name)
+        if layer_collection is None:
+            if collection.name not in context.scene.collection.children:
+                context.scene.collection.children.link(collection)
+            layer_collection = view_layer.layer_collection.children[collection.name]
+            layer_collections[collection.name] = layer_collection
+        if collection.name in excluded:
+            layer_collection.exclude = False
+        view_layer.active_layer_collection = layer_collection
 
-        if existing_collection:
-            # Collection already exists, switch to it
-            bpy.context.view_layer.active_layer_collection = bpy.context.view_layer.layer_collection.children[collection_name]
-        else:
-            # Collection does not exist, create a new one
-            new_collection = bpy.data.collections.new(collection_name)
-            bpy.context.scene.collection.children.link(new_collection)
-            bpy.context.view_layer.active_layer_collection = bpy.context.view_layer.layer_collection.children[collection_name]
+        # Append the cached result of an identical earlier import instead of parsing the file
+        objects = cache.append(str(fp), collection) if cache is not None else None
+        if objects is None:
+            # The importer selects what it creates, start from an empty selection
+            for obj in context.selected_objects:
+                obj.select_set(False)
+
+            # Import the DAE file
+            try:
+                bpy.ops.wm.collada_import(filepath=str(fp))
+            except RuntimeError as e:
+                self.report({'WARNING'}, f"{os.path.basename(fp)}: {e}")
+                if failed is not None:
+                    failed.append(str(fp))
+                # A partial result is neither cached nor linked, the file is retried as a whole
+                continue
+
+            # Exactly the objects this file created
+            objects = list(context.selected_objects)
+            if cache is not None:
+                cache.store(str(fp), objects)
 
-        # Import the DAE file
-        bpy.ops.wm.collada_import(filepath=str(fp))
+            # Move the imported objects to the collection
+            if import_as_collection:
+                link_objects(collection, objects)
+        tag_import_source(objects, str(fp))
 
-        # Move the imported objects to the collection
-        if import_as_collection:
-            imported_objects = bpy.context.selected_objects
-            for obj in imported_objects:
-                # Check if the object is already in the collection
-                if obj.name not in bpy.context.view_layer.active_layer_collection.collection.objects:
-                    bpy.context.view_layer.active_layer_collection.collection.objects.link(obj)
+        # Point the file's copies of already loaded textures at the first one
+        if images is not None:
+            images.deduplicate()
 
-        # Switch back to the main collection
-        bpy.context.view_layer.active_layer_collection = bpy.context.view_layer.layer_collection
+        # Keep finished files out of the view layer, so later imports don't evaluate them again
+        if fast_batch:
+            excluded.setdefault(collection.name, layer_collection.exclude)
+            layer_collection.exclude = True
+
+    # Bring the collections back and evaluate the scene once
+    if excluded:
+        layer_collections = build_layer_collection_index(view_layer)
+        for name, exclude in excluded.items():
+            layer_collections[name].exclude = exclude
+        view_layer.update()
+
+    # Switch back to the collection that was active before
+    view_layer.active_layer_collection = active_layer_collection
 
     return {'FINISHED'}
 
-class ImportSomeData(Operator, ImportHelper):
-    """This appears in the tooltip of the operator and in the generated docs"""
-    bl_idname = "import_test.some_data"  # important since its how bpy.ops.import_test.some_data is constructed
-    bl_label = "Import DAE(s)"
-    bl_description = "Batch import DAE files and create collections"
-    # ImportHelper mixin class uses this
-    filename_ext = "*.dae"
+def tag_import_source(objects, file_path):
+    # Remember the source file on imported objects, so a re-import replaces only them
+    for obj in objects:
+        obj[IMPORT_SOURCE_PROPERTY] = file_path
 
-    filter_glob: StringProperty(
-        default=filename_ext,
-        options={'HIDDEN'},
-        maxlen=255,  # Max internal buffer length, longer would be clamped.
+def build_layer_collection_index(view_layer):
+    # Map collection names to their layer collections, nested ones included
+    index = {}
+    pending = [view_layer.layer_collection]
+    while pending:
+        layer_collection = pending.pop()
+        index[layer_collection.collection.name] = layer_collection
+        pending.extend(layer_collection.children)
+    return index
+
+def link_objects(collection, objects):
+    # Link objects into collection in one pass, membership checked against a set
+    linked = set(collection.objects)
+    for obj in objects:
+        if obj not in linked:
+            collection.objects.link(obj)
+            linked.add(obj)
+
+def canonical_image_path(image):
+    # Absolute, normalised path of an image file, empty for packed and generated images
+    if image.source != 'FILE' or image.packed_file is not None or not image.filepath:
+        return ""
+    path = bpy.path.abspath(image.filepath, library=image.library)
+    return os.path.normcase(os.path.realpath(path))
+
+def image_header_size(f):
+    # Width and height from the header of a PNG, JPEG, TGA or BMP file without decoding
+    # the pixels, None for other formats
+    head = f.read(26)
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:2] == b"BM" and len(head) >= 26:
+        width, height = struct.unpack("<ii", head[18:26])
+        return width, abs(height)
+    if head[:2] == b"\xff\xd8":
+        # Walk the JPEG segments up to the first start of frame
+        f.seek(2)
+        while True:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                frame = f.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+            f.seek(struct.unpack(">H", marker[2:4])[0] - 2, 1)
+    if f.name.lower().endswith(".tga") and len(head) >= 16:
+        return struct.unpack("<HH", head[12:16])
+    return None
+
+def image_memory_bytes(image):
+    # Uncompressed size of an image in memory. Images without loaded pixels are
+    # estimated from their file header as 8 bit RGBA, reading image.size would
+    # load them. None when the size can't be told without loading.
+    if image.has_data:
+        width, height = image.size
+        return width * height * image.channels * (4 if image.is_float else 1)
+    path = canonical_image_path(image)
+    try:
+        with open(path, "rb") as f:
+            size = image_header_size(f)
+    except OSError:
+        return None
+    return size[0] * size[1] * 4 if size is not None else None
+
+class ImageDeduplicator:
+    """Keeps one image datablock per image file over a batch import, images
+    the scene already had are reused first"""
+
+    def __init__(self):
+        self.canonical = {}
+        self.seen = set()
+        self.duplicates = 0
+        self.saved_bytes = 0
+        # Sizes by file, and the number of avoided loads whose size is unknown
+        self.sizes = {}
+        self.unmeasured = 0
+        # The user's own images are only canonical candidates, never remapped or removed
+        for image in bpy.data.images:
+            self.seen.add(image.name_full)
+            path = canonical_image_path(image)
+            if path:
+                self.canonical.setdefault(path, image)
+
+    def deduplicate(self):
+        # Remap images added since the last call onto the image of the same file
+        for image in list(bpy.data.images):
+            if image.name_full in self.seen:
+                continue
+            self.seen.add(image.name_full)
+            path = canonical_image_path(image)
+            if not path:
+                continue
+            canonical = self.canonical.get(path)
+            if canonical is None:
+                self.canonical[path] = image
+                continue
+            # Linked images belong to their library and stay
+            if image.library is not None:
+                continue
+            image.user_remap(canonical)
+            bpy.data.images.remove(image)
+            self.duplicates += 1
+            if path not in self.sizes:
+                self.sizes[path] = image_memory_bytes(canonical)
+            if self.sizes[path] is None:
+                self.unmeasured += 1
+            else:
+                self.saved_bytes += self.sizes[path]
+
+    def summary(self):
+        unmeasured = f", {self.unmeasured} of unknown size" if self.unmeasured else ""
+        return (f"{self.duplicates} duplicate image loads avoided, about {self.saved_bytes / (1024 * 1024):.1f} MB "
+                f"saved{unmeasured}")
+
+# Properties that only affect naming, the editor layout or bookkeeping, not how a material renders
+SIGNATURE_SKIPPED_PROPERTIES = {
+    "name", "name_full", "label", "location", "width", "width_hidden", "height", "select", "hide",
+    "show_options", "show_preview", "show_texture", "use_custom_color", "color", "parent",
+    "use_fake_user", "use_extra_user", "tag", "is_runtime_data", "preview_render_type",
+}
+
+def signature_value(value):
+    # Hashable, comparable form of a property value, images by file and other IDs by name
+    if isinstance(value, bpy.types.Image):
+        return ("IMAGE", canonical_image_path(value) or value.name_full)
+    if isinstance(value, bpy.types.NodeTree):
+        return ("TREE", node_tree_signature(value))
+    if isinstance(value, bpy.types.ID):
+        return ("ID", value.name_full)
+    if isinstance(value, float):
+        return round(value, 6)
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return tuple(signature_value(item) for item in value)
+    return value
+
+def rna_signature(data):
+    # Editable settings of an RNA struct as a sorted tuple
+    items = []
+    for prop in data.bl_rna.properties:
+        if prop.identifier in SIGNATURE_SKIPPED_PROPERTIES or prop.identifier == "rna_type":
+            continue
+        # Of the read-only pointers only the node tree is part of the look, others like original point back
+        if prop.type == 'COLLECTION' or (prop.is_readonly and prop.identifier != "node_tree"):
+            continue
+        if prop.type == 'POINTER' and not isinstance(getattr(data, prop.identifier), (bpy.types.ID, type(None))):
+            continue
+        items.append((prop.identifier, signature_value(getattr(data, prop.identifier))))
+    return tuple(items)
+
+def node_tree_signature(tree):
+    # Node types, settings, unlinked input values, output values and links of a node tree
+    nodes = []
+    for node in sorted(tree.nodes, key=lambda node: node.name):
+        inputs = tuple(
+            (socket.identifier, signature_value(socket.default_value))
+            for socket in node.inputs if not socket.is_linked and hasattr(socket, "default_value")
+        )
+        # RGB and Value nodes keep their value on the output, linked or not
+        outputs = tuple(
+            (socket.identifier, signature_value(socket.default_value))
+            for socket in node.outputs if hasattr(socket, "default_value")
+        )
+        nodes.append((node.name, node.bl_idname, rna_signature(node), inputs, outputs))
+    links = sorted(
+        (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+        for link in tree.links if link.is_valid and not link.is_muted
     )
+    return (tuple(nodes), tuple(links))
+
+def material_signature(material):
+    # Structural signature of a material, equal for materials that render the same
+    return hashlib.sha1(repr(rna_signature(material)).encode()).hexdigest()
+
+class MaterialDeduplicator:
+    """Merges materials a batch import created into one canonical datablock per node
+    graph signature, materials the scene already had are reused first"""
+
+    def __init__(self):
+        self.canonical = {}
+        self.seen = set()
+        self.before = 0
+        self.after = 0
+        for material in bpy.data.materials:
+            self.seen.add(material.name_full)
+            self.canonical.setdefault(material_signature(material), material)
+
+    def deduplicate(self):
+        # Remap the materials added since the last call onto their canonical material
+        duplicates = {}
+        for material in list(bpy.data.materials):
+            if material.name_full in self.seen:
+                continue
+            self.seen.add(material.name_full)
+            # Linked materials belong to their library and stay
+            if material.library is not None:
+                continue
+            canonical = self.canonical.setdefault(material_signature(material), material)
+            if canonical != material:
+                duplicates[material] = canonical
+
+        self.before = len(bpy.data.materials)
+        for material, canonical in duplicates.items():
+            material.user_remap(canonical)
+        bpy.data.batch_remove(list(duplicates))
+        self.after = len(bpy.data.materials)
+
+    def summary(self):
+        return f"Materials: {self.before} before, {self.after} after merging identical node graphs"
+
+def file_digest(file_path):
+    # SHA-1 of a file's content, read in chunks
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ImportCache:
+    """Results of earlier DAE imports stored as .blend libraries, keyed by the content
+    hash of the file and the import settings, trimmed least recently used first"""
+
+    def __init__(self, folder_path, limit_mb, settings_key):
+        self.folder_path = folder_path
+        self.limit = limit_mb * 1024 * 1024
+        self.settings_key = settings_key
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(folder_path, exist_ok=True)
+        self.index_path = os.path.join(folder_path, CACHE_INDEX_NAME)
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.files = data.get("files", {}) if data.get("version") == CACHE_VERSION else {}
+
+    def library_path(self, file_path):
+        # Files are only hashed again when their size or modification time changed
+        stat = os.stat(file_path)
+        entry = self.files.get(file_path)
+        if entry is None or entry["size"] != stat.st_size or entry["mtime"] != stat.st_mtime_ns:
+            entry = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "sha1": file_digest(file_path)}
+            self.files[file_path] = entry
+        return os.path.join(self.folder_path, f"{entry['sha1']}_{self.settings_key}.blend")
+
+    def append(self, file_path, collection):
+        # Append the objects of a cached import into collection, None on a miss
+        library_path = self.library_path(file_path)
+        if not os.path.exists(library_path):
+            self.misses += 1
+            return None
+
+        with bpy.data.libraries.load(library_path, link=False) as (data_from, data_to):
+            data_to.objects = list(data_from.objects)
+        objects = [obj for obj in data_to.objects if obj is not None]
+        for obj in objects:
+            obj.use_fake_user = False
+            collection.objects.link(obj)
+        # The modification time orders the libraries for eviction
+        os.utime(library_path)
+        self.hits += 1
+        return objects
+
+    def store(self, file_path, objects):
+        # Write the objects of a fresh import, with everything they use, as the file's library
+        if not objects:
+            return
+        library_path = self.library_path(file_path)
+        temp_path = os.path.join(self.folder_path, ".partial_" + os.path.basename(library_path))
+        bpy.data.libraries.write(temp_path, set(objects), path_remap='ABSOLUTE', fake_user=True)
+        os.replace(temp_path, library_path)
+
+    def close(self):
+        # Save the index and drop the oldest libraries until the cache fits its limit
+        libraries = []
+        for entry in os.scandir(self.folder_path):
+            if entry.name.endswith(".blend") and not entry.name.startswith(".partial_"):
+                stat = entry.stat()
+                libraries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in libraries)
+        for _, size, path in sorted(libraries):
+            if total <= self.limit:
+                break
+            os.remove(path)
+            total -= size
+
+        self.files = {path: entry for path, entry in self.files.items() if os.path.exists(path)}
+        with open(self.index_path + ".tmp", "w") as f:
+            json.dump({"version": CACHE_VERSION, "files": self.files}, f)
+        os.replace(self.index_path + ".tmp", self.index_path)
+
+    def summary(self):
+        return f"Import cache: {self.hits} hits, {self.misses} misses"
+
+def get_import_collection(context, collection_name):
+    # Collection of the scene a DAE file is imported into, created when missing
+    collection = bpy.data.collections.get(collection_name)
+    if collection is None:
+        collection = bpy.data.collections.new(collection_name)
+        context.scene.collection.children.link(collection)
+    return collection
+
+def read_dae_floats(text):
+    return np.fromstring(text or "", dtype=np.float64, sep=" ")
+
+def read_dae_ints(text):
+    return np.fromstring(text or "", dtype=np.int64, sep=" ").astype(np.int32)
+
+def read_dae_source(source, decoded):
+    # <source> as a (count, stride) float array
+    float_array = source.find("float_array")
+    values = decoded.get(float_array) if float_array is not None else None
+    if values is None:
+        values = np.zeros(0)
+    accessor = source.find("technique_common/accessor")
+    stride = int(accessor.get("stride", 1)) if accessor is not None else 1
+    return values[:len(values) // stride * stride].reshape(-1, stride)
+
+def read_dae_primitive(primitive, decoded):
+    # Corner index table of a <triangles>, <polylist> or <polygons> element and its polygon sizes
+    inputs = primitive.findall("input")
+    stride = max((int(i.get("offset", 0)) for i in inputs), default=0) + 1
+    empty = np.zeros(0, dtype=np.int32)
+    if primitive.tag == "polygons":
+        # One <p> per polygon, holes (<ph>) are not supported
+        polygons = [decoded.get(p, empty) for p in primitive.iterfind("p")]
+        indices = np.concatenate(polygons) if polygons else empty
+        totals = np.array([len(p) // stride for p in polygons], dtype=np.int32)
+    else:
+        p = primitive.find("p")
+        indices = decoded.get(p, empty) if p is not None else empty
+        if primitive.tag == "triangles":
+            totals = np.full(len(indices) // (stride * 3), 3, dtype=np.int32)
+        else:
+            vcount = primitive.find("vcount")
+            totals = decoded.get(vcount, empty) if vcount is not None else empty
+    return inputs, indices[:len(indices) // stride * stride].reshape(-1, stride), totals
+
+def join_dae_layers(layers, corner_counts, columns):
+    # Concatenate a per corner layer over the primitives, zeros where a primitive has none
+    return np.concatenate([
+        layer if layer is not None else np.zeros((count, columns))
+        for layer, count in zip(layers, corner_counts)
+    ]).astype(np.float32)
+
+def parse_dae_geometry(geometry, decoded):
+    # Geometry as flat mesh arrays, its primitives joined with one material index per symbol
+    mesh = geometry.find("mesh")
+    if mesh is None:
+        return None
+    sources = {source.get("id"): source for source in mesh.iterfind("source")}
+    read_sources = {}
+
+    def source_array(url):
+        key = url.lstrip("#")
+        if key not in read_sources:
+            read_sources[key] = read_dae_source(sources[key], decoded)
+        return read_sources[key]
+
+    # <vertices> may carry per vertex normals, UVs and colours next to the positions
+    vertices = mesh.find("vertices")
+    vertex_inputs = {i.get("semantic"): source_array(i.get("source")) for i in vertices.iterfind("input")}
+    positions = vertex_inputs["POSITION"][:, :3]
+
+    corners, totals, material_indices, normals = [], [], [], []
+    layers = {"uv": {}, "color": {}}
+    symbols = []
+    for primitive in mesh:
+        if primitive.tag not in ("triangles", "polylist", "polygons"):
+            continue
+        inputs, indices, primitive_totals = read_dae_primitive(primitive, decoded)
+        if not len(primitive_totals):
+            continue
+        symbol = primitive.get("material", "")
+        if symbol not in symbols:
+            symbols.append(symbol)
+
+        primitive_normals = None
+        primitive_layers = {"uv": {}, "color": {}}
+        for i in inputs:
+            column = indices[:, int(i.get("offset", 0))]
+            semantic = i.get("semantic")
+            if semantic == "VERTEX":
+                corners.append(column)
+                if "NORMAL" in vertex_inputs:
+                    primitive_normals = vertex_inputs["NORMAL"][column, :3]
+                if "TEXCOORD" in vertex_inputs:
+                    primitive_layers["uv"].setdefault("UVMap", vertex_inputs["TEXCOORD"][column, :2])
+                if "COLOR" in vertex_inputs:
+                    primitive_layers["color"].setdefault("Col", vertex_inputs["COLOR"][column])
+            elif semantic == "NORMAL":
+                primitive_normals = source_array(i.get("source"))[column, :3]
+            elif semantic == "TEXCOORD":
+                uvs = primitive_layers["uv"]
+                name = "UVMap" if not uvs else f"UVMap.{i.get('set', len(uvs))}"
+                uvs[name] = source_array(i.get("source"))[column, :2]
+            elif semantic == "COLOR":
+                colors = primitive_layers["color"]
+                name = "Col" if not colors else f"Col.{i.get('set', len(colors))}"
+                colors[name] = source_array(i.get("source"))[column]
+
+        totals.append(primitive_totals)
+        material_indices.append(np.full(len(primitive_totals), symbols.index(symbol), dtype=np.int32))
+        normals.append(primitive_normals)
+        for kind, primitive_layer in primitive_layers.items():
+            for name, values in primitive_layer.items():
+                layers[kind].setdefault(name, [None] * (len(totals) - 1)).append(values)
+            for layer in layers[kind].values():
+                if len(layer) < len(totals):
+                    layer.append(None)
+
+    if not corners:
+        return None
+    corner_counts = [len(c) for c in corners]
+    arrays = {
+        "positions": positions.astype(np.float32),
+        "corner_vertices": np.concatenate(corners).astype(np.int32),
+        "loop_totals": np.concatenate(totals),
+        "material_indices": np.concatenate(material_indices),
+    }
+    # Normals are only kept when every primitive has them, missing UVs and colours are zero
+    if all(n is not None for n in normals):
+        arrays["normals"] = np.concatenate(normals).astype(np.float32)
+    for index, layer in enumerate(layers["uv"].values()):
+        arrays[f"uv_{index}"] = join_dae_layers(layer, corner_counts, 2)
+    for index, layer in enumerate(layers["color"].values()):
+        # RGB sources get an opaque alpha
+        layer = [c if c is None or c.shape[1] == 4 else np.column_stack((c[:, :3], np.ones(len(c)))) for c in layer]
+        arrays[f"color_{index}"] = join_dae_layers(layer, corner_counts, 4)
+
+    return {
+        "id": geometry.get("id"),
+        "name": geometry.get("name") or geometry.get("id"),
+        "symbols": symbols,
+        "uv_names": list(layers["uv"]),
+        "color_names": list(layers["color"]),
+        "arrays": arrays,
+    }
+
+def dae_node_matrix(node):
+    # Local transform of a <node>, its transform elements applied in document order
+    matrix = np.identity(4)
+    for element in node:
+        if element.tag not in ("matrix", "translate", "scale", "rotate"):
+            continue
+        values = read_dae_floats(element.text)
+        if element.tag == "matrix":
+            local = values.reshape(4, 4)
+        elif element.tag == "translate":
+            local = np.identity(4)
+            local[:3, 3] = values
+        elif element.tag == "scale":
+            local = np.diag([values[0], values[1], values[2], 1.0])
+        else:
+            axis = values[:3] / max(np.linalg.norm(values[:3]), 1e-12)
+            angle = np.radians(values[3])
+            cross = np.array([[0, -axis[2], axis[1]], [axis[2], 0, -axis[0]], [-axis[1], axis[0], 0]])
+            local = np.identity(4)
+            local[:3, :3] = np.identity(3) + np.sin(angle) * cross + (1 - np.cos(angle)) * cross @ cross
+        matrix = matrix @ local
+    return matrix
+
+def parse_dae_nodes(node, parent, nodes, library_nodes, depth=0):
+    # Flatten the node tree into a list, parents before their children. Every node keeps
+    # its local matrix, extra geometry instances of a node become children of it.
+    index = len(nodes)
+    name = node.get("name") or node.get("id") or "node"
+    instances = node.findall("instance_geometry")
+    nodes.append({
+        "name": name,
+        "matrix": dae_node_matrix(node).ravel().tolist(),
+        "parent": parent,
+        "geometry": "",
+        "bindings": {},
+    })
+    for number, instance in enumerate(instances):
+        entry = nodes[index]
+        if number:
+            entry = {"name": f"{name}.{number}", "matrix": np.identity(4).ravel().tolist(), "parent": index}
+            nodes.append(entry)
+        entry["geometry"] = instance.get("url", "").lstrip("#")
+        entry["bindings"] = {
+            bind.get("symbol"): bind.get("target", "").lstrip("#")
+            for bind in instance.iterfind("bind_material/technique_common/instance_material")
+        }
+
+    # <instance_node> reuses a node of <library_nodes>, guard against reference cycles
+    children = list(node.iterfind("node"))
+    if depth < 32:
+        for instance in node.iterfind("instance_node"):
+            child = library_nodes.get(instance.get("url", "").lstrip("#"))
+            if child is not None:
+                children.append(child)
+    for child in children:
+        parse_dae_nodes(child, index, nodes, library_nodes, depth + 1)
+
+def dae_image_path(image, dae_path):
+    # Absolute path of an <image>, relative paths are relative to the DAE file
+    init_from = image.find("init_from")
+    if init_from is None:
+        return ""
+    text = init_from.findtext("ref") or init_from.text or ""
+    path = unquote(text.strip())
+    if path.startswith("file://"):
+        path = path[len("file://"):]
+        # file:///C:/... on Windows
+        if len(path) > 2 and path[0] == "/" and path[2] == ":":
+            path = path[1:]
+    if not path:
+        return ""
+    return os.path.normpath(os.path.join(os.path.dirname(dae_path), path))
+
+def parse_dae_effect(effect, images):
+    # Diffuse colour and texture of a profile_COMMON effect
+    params = {param.get("sid"): param for param in effect.iterfind("profile_COMMON/newparam")}
+    for shading in effect.iterfind("profile_COMMON/technique/*"):
+        diffuse = shading.find("diffuse")
+        if diffuse is None:
+            continue
+        color = diffuse.findtext("color")
+        if color:
+            values = read_dae_floats(color).tolist()
+            return {"color": (values + [1.0] * 4)[:4], "image": ""}
+        texture = diffuse.find("texture")
+        if texture is not None:
+            # texture -> sampler2D -> surface -> image, or straight to an image
+            target = texture.get("texture", "")
+            sampler = params.get(target)
+            if sampler is not None:
+                surface = params.get(sampler.findtext("sampler2D/source", "").strip())
+                instance = sampler.find("sampler2D/instance_image")
+                if surface is not None:
+                    target = surface.findtext("surface/init_from", "").strip()
+                elif instance is not None:
+                    target = instance.get("url", "").lstrip("#")
+            return {"color": [0.8, 0.8, 0.8, 1.0], "image": images.get(target, "")}
+    return {"color": [0.8, 0.8, 0.8, 1.0], "image": ""}
+
+def parse_dae_visual_scene(root):
+    # Nodes of the visual scene the file instantiates, the first one without a <scene>
+    library_nodes = {node.get("id"): node for node in root.iterfind("library_nodes/node")}
+    scenes = {scene.get("id"): scene for scene in root.iterfind("library_visual_scenes/visual_scene")}
+    instance = root.find("scene/instance_visual_scene")
+    visual_scene = scenes.get(instance.get("url", "").lstrip("#")) if instance is not None else None
+    if visual_scene is None and scenes:
+        visual_scene = next(iter(scenes.values()))
+    nodes = []
+    if visual_scene is not None:
+        for node in visual_scene.iterfind("node"):
+            parse_dae_nodes(node, -1, nodes, library_nodes)
+    return nodes
+
+def parse_dae(file_path, geometry_ids=None):
+    # Read a COLLADA file into plain data and NumPy arrays, without touching bpy
+    # so it can run in a worker process. The XML is streamed: number lists are
+    # decoded as soon as they are read and every geometry is dropped from the
+    # tree once it has been turned into arrays. With geometry_ids only those
+    # geometries are decoded.
+    decoded = {}
+    meshes = []
+    root = None
+    skip = False
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            elif geometry_ids is not None and element.tag.endswith("geometry"):
+                skip = element.get("id") not in geometry_ids
+            continue
+        element.tag = element.tag.rpartition("}")[2]
+        if element.tag == "float_array":
+            if not skip:
+                decoded[element] = read_dae_floats(element.text)
+            element.text = None
+        elif element.tag in ("p", "vcount"):
+            if not skip:
+                decoded[element] = read_dae_ints(element.text)
+            element.text = None
+        elif element.tag == "geometry":
+            mesh = parse_dae_geometry(element, decoded) if not skip else None
+            if mesh is not None:
+                meshes.append(mesh)
+            for child in element.iter():
+                decoded.pop(child, None)
+            element.clear()
+            skip = False
+
+    unit = root.find("asset/unit")
+    images = {image.get("id"): dae_image_path(image, file_path) for image in root.iter("image")}
+    effects = {effect.get("id"): parse_dae_effect(effect, images) for effect in root.iterfind("library_effects/effect")}
+    materials = {}
+    for material in root.iterfind("library_materials/material"):
+        instance = material.find("instance_effect")
+        effect_id = instance.get("url", "").lstrip("#") if instance is not None else ""
+        materials[material.get("id")] = dict(
+            effects.get(effect_id, {"color": [0.8, 0.8, 0.8, 1.0], "image": ""}),
+            name=material.get("name") or material.get("id"),
+        )
+
+    return {
+        "unit": float(unit.get("meter", 1.0)) if unit is not None else 1.0,
+        "up_axis": (root.findtext("asset/up_axis") or "Y_UP").strip(),
+        "materials": materials,
+        "meshes": meshes,
+        "nodes": parse_dae_visual_scene(root),
+    }
+
+def parse_dae_bounds(file_path):
+    # Bounds-only read of a COLLADA file for proxies: the local bounding box of every
+    # geometry and the node tree. Only the position source <vertices> points at is
+    # decoded, other sources and corner lists are skipped unread.
+    sources = {}
+    geometry_bounds = {}
+    root = None
+    for event, element in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = element
+            continue
+        element.tag = element.tag.rpartition("}")[2]
+        if element.tag in ("p", "vcount", "ph"):
+            element.text = None
+        elif element.tag == "source":
+            # <vertices> follows the sources, keep the text until the geometry ends
+            accessor = element.find("technique_common/accessor")
+            stride = int(accessor.get("stride", 1)) if accessor is not None else 1
+            sources[element.get("id")] = (element.findtext("float_array"), stride)
+            element.clear()
+        elif element.tag == "geometry":
+            position = element.find("mesh/vertices/input[@semantic='POSITION']")
+            text, stride = sources.get(position.get("source", "").lstrip("#"), (None, 0)) \
+                if position is not None else (None, 0)
+            if text and stride >= 3:
+                values = read_dae_floats(text)
+                values = values[:len(values) // stride * stride].reshape(-1, stride)[:, :3]
+                if len(values):
+                    geometry_bounds[element.get("id")] = [values.min(axis=0).tolist(), values.max(axis=0).tolist()]
+            sources.clear()
+            element.clear()
+
+    unit = root.find("asset/unit")
+    return {
+        "unit": float(unit.get("meter", 1.0)) if unit is not None else 1.0,
+        "up_axis": (root.findtext("asset/up_axis") or "Y_UP").strip(),
+        "bounds": geometry_bounds,
+        "nodes": parse_dae_visual_scene(root),
+    }
+
+def save_parsed_dae(parsed, file_path):
+    # Store a parsed file as .npz, the arrays as members and the rest as JSON
+    arrays = {}
+    meshes = []
+    for index, mesh in enumerate(parsed["meshes"]):
+        mesh = dict(mesh)
+        for key, array in mesh.pop("arrays").items():
+            arrays[f"mesh{index}_{key}"] = array
+        mesh["keys"] = [key for key in arrays if key.startswith(f"mesh{index}_")]
+        meshes.append(mesh)
+    meta = dict(parsed, meshes=meshes)
+    np.savez(file_path, meta=np.array(json.dumps(meta)), **arrays)
+
+def load_parsed_dae(file_path):
+    with np.load(file_path, allow_pickle=False) as data:
+        parsed = json.loads(str(data["meta"]))
+        for index, mesh in enumerate(parsed["meshes"]):
+            prefix = f"mesh{index}_"
+            mesh["arrays"] = {key[len(prefix):]: data[key] for key in mesh.pop("keys")}
+    return parsed
+
+def split_files_between_workers(file_paths, worker_count):
+    # Hand the biggest files out first, always to the least loaded worker
+    shares = [[] for _ in range(worker_count)]
+    loads = [0] * worker_count
+    for file_path in sorted(file_paths, key=os.path.getsize, reverse=True):
+        index = loads.index(min(loads))
+        shares[index].append(file_path)
+        loads[index] += os.path.getsize(file_path)
+    return [share for share in shares if share]
+
+def parse_dae_files_parallel(file_paths, worker_count, temp_dir):
+    # Parse DAE files in background Blender processes, returns {file: (npz path, error)}
+    shares = split_files_between_workers(file_paths, max(1, min(worker_count, len(file_paths))))
+    workers = []
+    for index, share in enumerate(shares):
+        job_path = os.path.join(temp_dir, f"job_{index}.json")
+        result_path = os.path.join(temp_dir, f"result_{index}.json")
+        log_path = os.path.join(temp_dir, f"worker_{index}.log")
+        with open(job_path, "w") as f:
+            json.dump({"files": share, "output": temp_dir, "worker": index, "results": result_path}, f)
+
+        command = [
+            bpy.app.binary_path, "-b", "--factory-startup",
+            "--python-exit-code", "1",
+            "--python", os.path.abspath(__file__),
+            "--", PARSE_WORKER_FLAG, job_path,
+        ]
+        log = open(log_path, "w")
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+        workers.append((process, log, share, result_path, log_path))
+
+    results = {}
+    for process, log, share, result_path, log_path in workers:
+        process.wait()
+        log.close()
+        if os.path.exists(result_path):
+            with open(result_path) as f:
+                for result in json.load(f):
+                    results[result["file"]] = (result["npz"], result["error"])
+            continue
+
+        # The worker died before writing anything, blame all of its files
+        with open(log_path) as f:
+            tail = f.read().strip().splitlines()[-1:]
+        error = tail[0] if tail else f"worker exited with code {process.returncode}"
+        for file_path in share:
+            results[file_path] = (None, error)
+    return results
+
+def run_parse_worker(job_path):
+    # Entry point of a background worker, parses the files listed in the job file to .npz
+    with open(job_path) as f:
+        job = json.load(f)
+
+    results = []
+    for index, file_path in enumerate(job["files"]):
+        npz_path = os.path.join(job["output"], f"parsed_{job['worker']}_{index}.npz")
+        try:
+            save_parsed_dae(parse_dae(file_path), npz_path)
+            results.append({"file": file_path, "npz": npz_path, "error": ""})
+        except Exception as e:
+            results.append({"file": file_path, "npz": None, "error": f"{type(e).__name__}: {e}"})
+
+    with open(job["results"], "w") as f:
+        json.dump(results, f)
+
+def build_dae_mesh(mesh_data):
+    # Blender mesh from parsed arrays, filled in bulk with foreach_set
+    arrays = mesh_data["arrays"]
+    positions = arrays["positions"]
+    corner_vertices = arrays["corner_vertices"]
+    totals = arrays["loop_totals"]
+
+    mesh = bpy.data.meshes.new(mesh_data["name"])
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.ravel())
+    mesh.loops.add(len(corner_vertices))
+    mesh.loops.foreach_set("vertex_index", corner_vertices)
+    mesh.polygons.add(len(totals))
+    mesh.polygons.foreach_set("loop_start", (np.cumsum(totals) - totals).astype(np.int32))
+    mesh.polygons.foreach_set("loop_total", totals)
+    mesh.polygons.foreach_set("material_index", arrays["material_indices"])
+    mesh.update(calc_edges=True)
+
+    for index, name in enumerate(mesh_data["uv_names"]):
+        uv_layer = mesh.uv_layers.new(name=name)
+        uv_layer.data.foreach_set("uv", arrays[f"uv_{index}"].ravel())
+
+    # COLLADA colours are display values, store them as sRGB byte colours like the builtin importer
+    for index, name in enumerate(mesh_data.get("color_names", ())):
+        attribute = mesh.color_attributes.new(name=name, type='BYTE_COLOR', domain='CORNER')
+        attribute.data.foreach_set("color_srgb", np.clip(arrays[f"color_{index}"], 0.0, 1.0).ravel())
+
+    if "normals" in arrays:
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(totals), dtype=bool))
+        if hasattr(mesh, "use_auto_smooth"):
+            mesh.use_auto_smooth = True
+        mesh.normals_split_custom_set(arrays["normals"])
+    mesh.validate(clean_customdata=False)
+    return mesh
+
+def load_dae_image(file_path):
+    # Image datablock of a texture, a placeholder keeping the path when the file is missing
+    try:
+        return bpy.data.images.load(file_path, check_existing=True)
+    except RuntimeError:
+        image = bpy.data.images.new(os.path.basename(file_path), 1, 1)
+        image.source = 'FILE'
+        image.filepath = file_path
+        return image
+
+def build_dae_material(data):
+    # Node material with the diffuse colour or texture of the effect on a Principled BSDF
+    material = bpy.data.materials.new(data["name"])
+    material.diffuse_color = data["color"]
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    principled = next((node for node in nodes if node.type == 'BSDF_PRINCIPLED'), None)
+    if principled is None:
+        return material
+    if data["image"]:
+        texture = nodes.new("ShaderNodeTexImage")
+        texture.image = load_dae_image(data["image"])
+        texture.location = (principled.location.x - 300, principled.location.y)
+        material.node_tree.links.new(texture.outputs["Color"], principled.inputs["Base Color"])
+    else:
+        principled.inputs["Base Color"].default_value = data["color"]
+    return material
+
+def dae_axis_matrix(parsed, import_units):
+    # Convert the file's up axis to Blender's Z up and optionally apply its unit
+    if parsed["up_axis"] == "Y_UP":
+        matrix = Matrix.Rotation(np.pi / 2, 4, 'X')
+    elif parsed["up_axis"] == "X_UP":
+        matrix = Matrix.Rotation(-np.pi / 2, 4, 'Y')
+    else:
+        matrix = Matrix.Identity(4)
+    if import_units:
+        matrix = matrix @ Matrix.Scale(parsed["unit"], 4)
+    return matrix
+
+def assign_dae_materials(obj, mesh, symbols, bindings, materials):
+    # The first instance fills the mesh slots, instances binding other materials get object slots
+    slot_materials = [materials.get(bindings.get(symbol, symbol)) for symbol in symbols]
+    if not mesh.materials:
+        for material in slot_materials:
+            mesh.materials.append(material)
+    elif list(mesh.materials) != slot_materials:
+        for slot, material in zip(obj.material_slots, slot_materials):
+            slot.link = 'OBJECT'
+            slot.material = material
+
+def build_dae_objects(parsed, collection, import_units, make_data):
+    # Create one object per node inside collection, keeping the node hierarchy.
+    # make_data(node) gives the object's data, None makes an empty.
+    axis_matrix = dae_axis_matrix(parsed, import_units)
+    objects = []
+    for node in parsed["nodes"]:
+        obj = bpy.data.objects.new(node["name"], make_data(node))
+        local = Matrix(np.array(node["matrix"]).reshape(4, 4).tolist())
+        if node["parent"] >= 0:
+            obj.parent = objects[node["parent"]]
+            obj.matrix_basis = local
+        else:
+            obj.matrix_basis = axis_matrix @ local
+        objects.append(obj)
+
+    for obj in objects:
+        collection.objects.link(obj)
+    return objects
+
+def build_parsed_dae(parsed, collection, import_units):
+    # Create the materials, meshes and objects of a parsed file inside collection.
+    # Nodes keep their hierarchy, nodes without geometry become empties.
+    materials = {material_id: build_dae_material(data) for material_id, data in parsed["materials"].items()}
+    meshes = {mesh_data["id"]: (build_dae_mesh(mesh_data), mesh_data["symbols"]) for mesh_data in parsed["meshes"]}
+    objects = build_dae_objects(parsed, collection, import_units,
+                                lambda node: meshes.get(node["geometry"], (None, ()))[0])
+    for node, obj in zip(parsed["nodes"], objects):
+        if obj.data is not None:
+            assign_dae_materials(obj, obj.data, meshes[node["geometry"]][1], node["bindings"], materials)
+    return objects
+
+def build_proxy_box(name, bounds):
+    # Box mesh spanning local bounds, standing in for a geometry that is not loaded
+    (x0, y0, z0), (x1, y1, z1) = bounds or ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+    vertices = [(x, y, z) for x in (x0, x1) for y in (y0, y1) for z in (z0, z1)]
+    faces = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(vertices, [], faces)
+    mesh[PROXY_BOX_PROPERTY] = True
+    return mesh
+
+def make_proxy(obj, box):
+    # Show obj as its bounding box until its geometry is loaded
+    obj.data = box
+    obj.display_type = 'BOUNDS'
+
+def build_dae_proxies(bounds, collection, file_path, import_units):
+    # Placeholder objects for a bounds-only read, each remembering where its geometry lives
+    boxes = {}
+
+    def make_box(node):
+        geometry = node["geometry"]
+        if geometry not in bounds["bounds"]:
+            return None
+        if geometry not in boxes:
+            boxes[geometry] = build_proxy_box(f"{geometry}_proxy", bounds["bounds"][geometry])
+        return boxes[geometry]
+
+    objects = build_dae_objects(bounds, collection, import_units, make_box)
+    for node, obj in zip(bounds["nodes"], objects):
+        if obj.data is None:
+            continue
+        obj.display_type = 'BOUNDS'
+        obj[PROXY_SOURCE_PROPERTY] = file_path
+        obj[PROXY_GEOMETRY_PROPERTY] = node["geometry"]
+        obj[PROXY_BINDINGS_PROPERTY] = json.dumps(node["bindings"])
+        obj[PROXY_BOUNDS_PROPERTY] = json.dumps(bounds["bounds"][node["geometry"]])
+    return objects
+
+def import_dae_proxies(operator, context, file_paths, import_units, failed=None):
+    # Import bounding box placeholders for DAE files, one collection per file
+    start = time.perf_counter()
+    object_count = 0
+    failed_count = 0
+    for file_path in file_paths:
+        try:
+            bounds = parse_dae_bounds(file_path)
+        except Exception as e:
+            failed_count += 1
+            operator.report({'WARNING'}, f"{os.path.basename(file_path)}: {type(e).__name__}: {e}")
+            if failed is not None:
+                failed.append(file_path)
+            continue
+        collection = get_import_collection(context, os.path.basename(file_path).split('.')[0])
+        objects = build_dae_proxies(bounds, collection, file_path, import_units)
+        tag_import_source(objects, file_path)
+        object_count += len(objects)
+
+    operator.report({'INFO'}, f"Imported {len(file_paths) - failed_count}/{len(file_paths)} DAE files as "
+                              f"{object_count} proxies in {time.perf_counter() - start:.1f}s")
+    return {'FINISHED'}
+
+def is_dae_proxy(obj):
+    return obj.type == 'MESH' and PROXY_SOURCE_PROPERTY in obj
+
+def load_dae_proxies(objects):
+    # Replace the boxes of proxies with their full geometry, reading each source
+    # file once and decoding only the geometries asked for
+    by_file = {}
+    for obj in objects:
+        if is_dae_proxy(obj) and obj.data.get(PROXY_BOX_PROPERTY):
+            by_file.setdefault(obj[PROXY_SOURCE_PROPERTY], []).append(obj)
+
+    # Materials made by earlier loads are reused
+    known_materials = {
+        (material.get(PROXY_SOURCE_PROPERTY), material.get(PROXY_MATERIAL_PROPERTY)): material
+        for material in bpy.data.materials if PROXY_MATERIAL_PROPERTY in material
+    }
+
+    loaded = 0
+    for file_path, group in by_file.items():
+        parsed = parse_dae(file_path, {obj[PROXY_GEOMETRY_PROPERTY] for obj in group})
+        meshes = {mesh_data["id"]: (build_dae_mesh(mesh_data), mesh_data["symbols"]) for mesh_data in parsed["meshes"]}
+        materials = {}
+        for material_id, data in parsed["materials"].items():
+            material = known_materials.get((file_path, material_id))
+            if material is None:
+                material = build_dae_material(data)
+                material[PROXY_SOURCE_PROPERTY] = file_path
+                material[PROXY_MATERIAL_PROPERTY] = material_id
+            materials[material_id] = material
+
+        for obj in group:
+            mesh, symbols = meshes.get(obj[PROXY_GEOMETRY_PROPERTY], (None, ()))
+            if mesh is None:
+                continue
+            box = obj.data
+            obj.data = mesh
+            obj.display_type = 'TEXTURED'
+            if box.users == 0:
+                bpy.data.meshes.remove(box)
+            assign_dae_materials(obj, mesh, symbols, json.loads(obj[PROXY_BINDINGS_PROPERTY]), materials)
+            loaded += 1
+
+        # Geometries of the file nobody asked for again
+        for mesh, _ in meshes.values():
+            if mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+    return loaded
+
+def unload_dae_proxies(objects):
+    # Turn loaded proxies back into boxes and free the geometry no object uses any more
+    boxes = {}
+    meshes = set()
+    unloaded = 0
+    for obj in objects:
+        if not is_dae_proxy(obj) or obj.data.get(PROXY_BOX_PROPERTY):
+            continue
+        key = (obj[PROXY_SOURCE_PROPERTY], obj[PROXY_GEOMETRY_PROPERTY])
+        if key not in boxes:
+            boxes[key] = build_proxy_box(f"{key[1]}_proxy", json.loads(obj[PROXY_BOUNDS_PROPERTY]))
+        meshes.add(obj.data)
+        # Object level material slots go with the mesh
+        make_proxy(obj, boxes[key])
+        unloaded += 1
+    bpy.data.batch_remove([mesh for mesh in meshes if mesh.users == 0])
+    return unloaded
+
+def proxies_in_region(objects, center, radius):
+    # Proxies whose world bounding box comes within radius of center
+    found = []
+    for obj in objects:
+        if not is_dae_proxy(obj):
+            continue
+        # Geometries without usable positions have no bounds, their origin stands in
+        bounds = json.loads(obj[PROXY_BOUNDS_PROPERTY]) or ((0.0, 0.0, 0.0), (0.0, 0.0, 0.0))
+        lo, hi = np.array(bounds)
+        corners = np.array([(x, y, z, 1.0) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])])
+        world = corners @ np.array(obj.matrix_world).T
+        closest = np.clip(np.array(center), world[:, :3].min(axis=0), world[:, :3].max(axis=0))
+        if np.linalg.norm(closest - np.array(center)) <= radius:
+            found.append(obj)
+    return found
+
+def iter_parsed_dae_files(file_paths, worker_count, temp_dir):
+    # Yield (file, parsed, error) in the order of file_paths, parsed in worker
+    # processes when there are several, otherwise one by one in this process
+    if worker_count > 1 and len(file_paths) > 1:
+        parsed_files = parse_dae_files_parallel(file_paths, worker_count, temp_dir)
+        for file_path in file_paths:
+            npz_path, error = parsed_files[file_path]
+            yield file_path, load_parsed_dae(npz_path) if npz_path else None, error
+        return
+
+    for file_path in file_paths:
+        try:
+            parsed = parse_dae(file_path)
+        except Exception as e:
+            yield file_path, None, f"{type(e).__name__}: {e}"
+            continue
+        yield file_path, parsed, ""
+
+def import_dae_files(operator, context, file_paths, worker_count, import_units, cache=None, images=None,
+                     failed=None):
+    # Import DAE files with the NumPy reader, one collection per file. Files
+    # found in the cache are appended, only the others are parsed.
+    start = time.perf_counter()
+    build_seconds = 0.0
+    failed_count = 0
+    object_count = 0
+
+    parse_paths = []
+    for file_path in file_paths:
+        collection = get_import_collection(context, os.path.basename(file_path).split('.')[0])
+        objects = cache.append(file_path, collection) if cache is not None else None
+        if objects is None:
+            parse_paths.append(file_path)
+        else:
+            tag_import_source(objects, file_path)
+            object_count += len(objects)
+            if images is not None:
+                images.deduplicate()
+
+    with tempfile.TemporaryDirectory(prefix="dae_import_") as temp_dir:
+        for file_path, parsed, error in iter_parsed_dae_files(parse_paths, worker_count, temp_dir):
+            if parsed is None:
+                failed_count += 1
+                operator.report({'WARNING'}, f"{os.path.basename(file_path)}: {error}")
+                if failed is not None:
+                    failed.append(file_path)
+                continue
+            build_start = time.perf_counter()
+            collection = get_import_collection(context, os.path.basename(file_path).split('.')[0])
+            objects = build_parsed_dae(parsed, collection, import_units)
+            tag_import_source(objects, file_path)
+            object_count += len(objects)
+            build_seconds += time.perf_counter() - build_start
+            if cache is not None:
+                cache.store(file_path, objects)
+            if images is not None:
+                images.deduplicate()
+
+    elapsed = time.perf_counter() - start
+    operator.report({'INFO'}, f"Imported {len(file_paths) - failed_count}/{len(file_paths)} DAE files, {object_count} objects "
+                              f"in {elapsed:.1f}s (building datablocks {build_seconds:.1f}s)")
+    return {'FINISHED'}
+
+def collada_importer_available():
+    # Blender's own COLLADA importer is missing from newer releases and from builds without it
+    return "collada_import" in dir(bpy.ops.wm)
+
+def make_import_cache(options, import_mode):
+    # Import cache for a batch, None when it is disabled. The built-in and the
+    # native importer build different datablocks, so they get separate entries.
+    if not options.prop_use_cache:
+        return None
+    folder_path = bpy.path.abspath(options.prop_cache_folder) if options.prop_cache_folder else \
+        bpy.utils.user_resource('DATAFILES', path=CACHE_FOLDER, create=True)
+    importer = "builtin" if import_mode == 'BUILTIN' else "native"
+    units = "units" if options.prop_import_units else "scene"
+    return ImportCache(folder_path, options.prop_cache_limit_mb, f"{importer}_{units}")
+
+def run_dae_import(operator, context, file_paths, options, failed=None):
+    # Import a batch of DAE files with the import mode, cache and image sharing of options
+    import_mode = options.prop_import_mode
+    if import_mode == 'BUILTIN' and not collada_importer_available():
+        operator.report({'INFO'}, "Blender has no COLLADA importer, using the native reader")
+        import_mode = 'NATIVE'
+
+    if import_mode == 'PROXY':
+        return import_dae_proxies(operator, context, file_paths, options.prop_import_units, failed)
+
+    cache = make_import_cache(options, import_mode)
+    images = ImageDeduplicator() if options.prop_dedupe_images else None
+    materials = MaterialDeduplicator() if options.prop_dedupe_materials else None
+    try:
+        if import_mode == 'BUILTIN':
+            result = read_some_data(operator, context, file_paths, options.prop_import_as_collection,
+                                    cache, images, options.prop_fast_batch, failed)
+        else:
+            worker_count = options.prop_worker_count if import_mode == 'PARALLEL' else 1
+            result = import_dae_files(operator, context, file_paths, worker_count, options.prop_import_units,
+                                      cache, images, failed)
+    finally:
+        if cache is not None:
+            cache.close()
+    if cache is not None:
+        operator.report({'INFO'}, cache.summary())
+    if images is not None:
+        operator.report({'INFO'}, images.summary())
+    # After the images, so materials using copies of the same image compare equal
+    if materials is not None:
+        materials.deduplicate()
+        operator.report({'INFO'}, materials.summary())
+    return result
+
+def scan_dae_folder(folder_path, recursive=True):
+    # Modification time and size of every DAE file below folder_path, one scandir per folder
+    found = {}
+    pending = [folder_path]
+    while pending:
+        try:
+            entries = list(os.scandir(pending.pop()))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    pending.append(entry.path)
+            elif entry.name.lower().endswith(".dae"):
+                stat = entry.stat()
+                found[os.path.normpath(entry.path)] = [stat.st_mtime_ns, stat.st_size]
+    return found
+
+def load_folder_index(scene):
+    # Files imported by folder import, kept in the scene so the index travels with the .blend
+    try:
+        return json.loads(scene.get(FOLDER_INDEX_PROPERTY, "{}"))
+    except ValueError:
+        return {}
+
+def save_folder_index(scene, index):
+    scene[FOLDER_INDEX_PROPERTY] = json.dumps(index)
+
+def remove_objects(objects):
+    # Delete objects and the meshes only they used
+    meshes = {obj.data for obj in objects if obj.type == 'MESH'}
+    bpy.data.batch_remove(objects)
+    bpy.data.batch_remove([mesh for mesh in meshes if mesh.users == 0])
+
+def move_names_aside(objects):
+    # Rename objects and their meshes out of the way, so a re-import gets the original
+    # names instead of .001 copies. Returns (datablock, name) pairs for restore_names().
+    datablocks = {*objects, *(obj.data for obj in objects if obj.type == 'MESH')}
+    renamed = [(datablock, datablock.name) for datablock in datablocks]
+    for datablock, name in renamed:
+        datablock.name = f"{name}~previous"
+    return renamed
+
+def restore_names(renamed):
+    # Give moved datablocks that still exist their names back
+    for datablock, name in renamed:
+        try:
+            datablock.name = name
+        except ReferenceError:
+            pass
+
+def sync_dae_folder(operator, context, folder_path, options):
+    # Import new and changed DAE files of a folder tree, replacing the objects
+    # earlier imports of the same files created. Returns the number of files imported.
+    scene = context.scene
+    index = load_folder_index(scene)
+    found = scan_dae_folder(folder_path, options.prop_recursive)
+    settled = time.time_ns() - int(FOLDER_SETTLE_SECONDS * 1e9)
+    changed = sorted(path for path, stamp in found.items() if index.get(path) != stamp and stamp[0] < settled)
+
+    # Files that disappeared leave the index, their collections stay
+    prefix = os.path.join(os.path.normpath(folder_path), "")
+    for path in [path for path in index if path.startswith(prefix) and path not in found]:
+        del index[path]
+
+    if changed:
+        # Objects of earlier imports of the changed files, files sharing a collection name keep theirs
+        changed_set = set(changed)
+        previous = {}
+        for obj in bpy.data.objects:
+            path = obj.get(IMPORT_SOURCE_PROPERTY)
+            if path in changed_set:
+                previous.setdefault(path, []).append(obj)
+
+        renamed = {path: move_names_aside(objects) for path, objects in previous.items()}
+
+        failed = []
+        try:
+            run_dae_import(operator, context, changed, options, failed)
+        except BaseException:
+            for moved in renamed.values():
+                restore_names(moved)
+            raise
+        # Replace the old objects only once the new import succeeded, a failed file keeps them until its retry
+        for path in changed:
+            if path not in failed:
+                remove_objects(previous.get(path, []))
+                index[path] = found[path]
+            # Whatever survived, a mesh other objects still use or a failed file's objects, gets its name back
+            restore_names(renamed.get(path, []))
+
+    save_folder_index(scene, index)
+    return len(changed)
+
+class PrintReporter:
+    """Stands in for an operator's report() where there is no operator, prints instead"""
+
+    def report(self, type, message):
+        print(f"{', '.join(sorted(type))}: {message}")
+
+# Folder kept in sync by the watch timer, None while no folder is watched
+folder_watch = None
+
+def watch_dae_folder():
+    # Timer callback re-syncing the watched folder, returns the delay until the next check
+    if folder_watch is None:
+        return None
+    # Only sync while a window shows the scene the watch was started from
+    window = next((w for w in bpy.context.window_manager.windows if w.scene.name == folder_watch["scene"]), None)
+    if window is None:
+        return folder_watch["interval"]
+    try:
+        with bpy.context.temp_override(window=window):
+            count = sync_dae_folder(PrintReporter(), bpy.context, folder_watch["folder"], folder_watch["options"])
+        if count:
+            print(f"Watch folder: imported {count} new or changed DAE files from {folder_watch['folder']}")
+    except Exception as e:
+        print(f"Watch folder: {e}")
+    return folder_watch["interval"]
+
+class DaeImportOptions:
+    """Import settings shared by the DAE import operators"""
 
     # List of operator properties, the attributes will be assigned
     # to the class instance from the operator settings before calling.
@@ -82,31 +1380,257 @@ class ImportSomeData(Operator, ImportHelper):
         description="Import each DAE file as its own collection",
         default=False,
     )
+
+    prop_import_mode: EnumProperty(
+        name="Import Mode",
+        description="How the selected DAE files are read",
+        items=(
+            ('BUILTIN', "Built-in", "Import one file after another with Blender's COLLADA importer, "
+                                    "falls back to Native when Blender has none"),
+            ('NATIVE', "Native", "Read the files in this process with the add-on's own NumPy COLLADA reader"),
+            ('PARALLEL', "Parallel", "Parse the files in background Blender processes into arrays and only build the meshes here"),
+            ('PROXY', "Proxy", "Only read bounding boxes and create box placeholders, load full geometry later "
+                               "for selected proxies or a region"),
+        ),
+        default='BUILTIN',
+    )
+
+    prop_worker_count: IntProperty(
+        name="Workers",
+        description="Number of background processes parsing DAE files in parallel mode",
+        default=max(1, (os.cpu_count() or 2) - 1),
+        min=1,
+        max=64,
+    )
+
+    prop_fast_batch: BoolProperty(
+        name="Fast Batch",
+        description="Take every imported file's collection out of the view layer until the batch is done, "
+                    "so each import only evaluates its own objects, then update the scene once",
+        default=False,
+    )
+
+    prop_dedupe_images: BoolProperty(
+        name="Share Images",
+        description="Use a single image datablock per image file over the whole batch instead of one per DAE file",
+        default=True,
+    )
+
+    prop_dedupe_materials: BoolProperty(
+        name="Merge Materials",
+        description="After the import, merge materials with identical node graphs, settings and images "
+                    "into one material",
+        default=True,
+    )
+
+    prop_use_cache: BoolProperty(
+        name="Use Import Cache",
+        description="Keep every imported file as a .blend library and append it instead of parsing when "
+                    "the same file is imported again",
+        default=False,
+    )
+
+    prop_cache_folder: StringProperty(
+        name="Cache Folder",
+        description="Folder of the import cache, Blender's user data folder when empty",
+        subtype='DIR_PATH',
+        default="",
+    )
+
+    prop_cache_limit_mb: IntProperty(
+        name="Cache Size (MB)",
+        description="Largest size of the import cache, the least recently used libraries are deleted beyond it",
+        default=4096,
+        min=1,
+    )
+
+class ImportSomeData(Operator, ImportHelper, DaeImportOptions):
+    """This appears in the tooltip of the operator and in the generated docs"""
+    bl_idname = "import_test.some_data"  # important since its how bpy.ops.import_test.some_data is constructed
+    bl_label = "Import DAE(s)"
+    bl_description = "Batch import DAE files and create collections"
+    # One undo step for the whole batch, the importers it calls push none of their own
+    bl_options = {'REGISTER', 'UNDO'}
+    # ImportHelper mixin class uses this
+    filename_ext = "*.dae"
+
+    filter_glob: StringProperty(
+        default=filename_ext,
+        options={'HIDDEN'},
+        maxlen=255,  # Max internal buffer length, longer would be clamped.
+    )
     
     files: CollectionProperty(type = PropertyGroup)
 
     def execute(self, context):
-        return read_some_data(self, context, self.filepath, True, self.prop_import_as_collection)
+        folder = Path(self.filepath).parent
+        file_paths = [str(Path(folder, selection.name)) for selection in self.files]
+        return run_dae_import(self, context, file_paths, self)
+
+class ImportDaeFolder(Operator, DaeImportOptions):
+    """Import every new or changed DAE file of a folder tree, replacing the content of collections imported before"""
+    bl_idname = "import_test.dae_folder"
+    bl_label = "Import DAE Folder"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    directory: StringProperty(
+        name="Folder",
+        subtype='DIR_PATH',
+    )
+
+    prop_recursive: BoolProperty(
+        name="Include Subfolders",
+        description="Also import the DAE files of all folders below the chosen one",
+        default=True,
+    )
+
+    prop_watch: BoolProperty(
+        name="Watch Folder",
+        description="Keep checking the folder and import DAE files as they are written or changed",
+        default=False,
+    )
+
+    prop_watch_interval: FloatProperty(
+        name="Interval",
+        description="Seconds between two checks of the watched folder",
+        default=5.0,
+        min=0.5,
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        global folder_watch
+        folder_path = bpy.path.abspath(self.directory)
+        if not os.path.isdir(folder_path):
+            self.report({'ERROR'}, f"Not a folder: {folder_path}")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        count = sync_dae_folder(self, context, folder_path, self)
+        self.report({'INFO'}, f"{count} new or changed DAE files in {time.perf_counter() - start:.1f}s")
+
+        if self.prop_watch:
+            # The timer outlives the operator, keep a copy of the settings
+            names = [*DaeImportOptions.__annotations__, "prop_recursive"]
+            options = SimpleNamespace(**{name: getattr(self, name) for name in names})
+            folder_watch = {"folder": folder_path, "scene": context.scene.name, "options": options,
+                            "interval": self.prop_watch_interval}
+            if not bpy.app.timers.is_registered(watch_dae_folder):
+                bpy.app.timers.register(watch_dae_folder, first_interval=self.prop_watch_interval)
+            self.report({'INFO'}, f"Watching {folder_path}")
+        return {'FINISHED'}
+
+class StopDaeFolderWatch(Operator):
+    """Stop keeping the watched folder in sync"""
+    bl_idname = "import_test.dae_folder_watch_stop"
+    bl_label = "Stop Watching DAE Folder"
+
+    @classmethod
+    def poll(cls, context):
+        return folder_watch is not None
+
+    def execute(self, context):
+        global folder_watch
+        folder_watch = None
+        if bpy.app.timers.is_registered(watch_dae_folder):
+            bpy.app.timers.unregister(watch_dae_folder)
+        return {'FINISHED'}
+
+class LoadDaeProxies(Operator):
+    """Load the full DAE geometry of proxy objects"""
+    bl_idname = "import_test.dae_proxy_load"
+    bl_label = "Load DAE Proxies"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    scope: EnumProperty(
+        name="Scope",
+        items=(
+            ('SELECTED', "Selected", "Load the selected proxies"),
+            ('REGION', "Around Cursor", "Load every proxy within the radius around the 3D cursor"),
+        ),
+        default='SELECTED',
+    )
+
+    radius: FloatProperty(
+        name="Radius",
+        description="Distance from the 3D cursor within which proxies are loaded",
+        default=100.0,
+        min=0.0,
+        subtype='DISTANCE',
+    )
+
+    def execute(self, context):
+        if self.scope == 'REGION':
+            objects = proxies_in_region(context.scene.objects, context.scene.cursor.location, self.radius)
+        else:
+            objects = context.selected_objects
+        start = time.perf_counter()
+        loaded = load_dae_proxies(objects)
+        self.report({'INFO'}, f"Loaded {loaded} proxies in {time.perf_counter() - start:.1f}s")
+        return {'FINISHED'}
+
+class UnloadDaeProxies(Operator):
+    """Turn the selected loaded DAE objects back into bounding box proxies and free their geometry"""
+    bl_idname = "import_test.dae_proxy_unload"
+    bl_label = "Unload DAE Proxies"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        unloaded = unload_dae_proxies(context.selected_objects)
+        self.report({'INFO'}, f"Unloaded {unloaded} proxies")
+        return {'FINISHED'}
+
+def menu_func_proxies(self, context):
+    self.layout.separator()
+    self.layout.operator(LoadDaeProxies.bl_idname, text="Load Selected DAE Proxies").scope = 'SELECTED'
+    self.layout.operator(LoadDaeProxies.bl_idname, text="Load DAE Proxies Around Cursor").scope = 'REGION'
+    self.layout.operator(UnloadDaeProxies.bl_idname)
 
 
 # Only needed if you want to add into a dynamic menu.
 def menu_func_import(self, context):
     self.layout.operator(ImportSomeData.bl_idname, text="Batch import DAE(s) as collection")
+    self.layout.operator(ImportDaeFolder.bl_idname, text="Import DAE folder as collections")
+    if folder_watch is not None:
+        self.layout.operator(StopDaeFolderWatch.bl_idname)
 
 
 # Register and add to the "file selector" menu (required to use F3 search "Text Import Operator" for quick access).
+classes = (
+    ImportSomeData,
+    ImportDaeFolder,
+    StopDaeFolderWatch,
+    LoadDaeProxies,
+    UnloadDaeProxies,
+)
+
 def register():
-    bpy.utils.register_class(ImportSomeData)
+    for cls in classes:
+        bpy.utils.register_class(cls)
     bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+    bpy.types.VIEW3D_MT_object.append(menu_func_proxies)
 
 
 def unregister():
-    bpy.utils.unregister_class(ImportSomeData)
+    global folder_watch
+    folder_watch = None
+    if bpy.app.timers.is_registered(watch_dae_folder):
+        bpy.app.timers.unregister(watch_dae_folder)
+    for cls in classes:
+        bpy.utils.unregister_class(cls)
     bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
+    bpy.types.VIEW3D_MT_object.remove(menu_func_proxies)
 
 
 if __name__ == "__main__":
     register()
 
+    # Started by parse_dae_files_parallel as a background worker
+    if PARSE_WORKER_FLAG in sys.argv:
+        run_parse_worker(sys.argv[sys.argv.index(PARSE_WORKER_FLAG) + 1])
+
     # test call
     #bpy.ops.import_test.some_data('INVOKE_DEFAULT')
\ No newline at end of file
@@ -0,0 +1,191 @@
+# Headless benchmark for the FBX batch exporter, run it with:
+#   blender -b --factory-startup --python FBX/benchmark_batch_export.py -- --collections 500 --objects 100 --output bench.json
+# Builds a synthetic scene, exports it with every export path and writes
+# per-phase timings (selection, exporter call, file write) and peak RSS as JSON.
+import bpy
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import io_batch_export_FBX_collection as batch_export
+
+MODES = ("selection", "selection_free")
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Benchmark the FBX batch exporter")
+    parser.add_argument("--collections", type=int, default=500, help="Number of collections")
+    parser.add_argument("--objects", type=int, default=100, help="Objects per collection")
+    parser.add_argument("--triangles", type=int, default=2, help="Triangles per object")
+    parser.add_argument("--materials", type=int, default=1, help="Number of materials spread over the objects")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="Export paths to run")
+    parser.add_argument("--output", default="", help="JSON file to write, printed to stdout when empty")
+    return parser.parse_args(argv)
+
+def peak_rss_mb():
+    # Peak resident set size of this process in MB
+    try:
+        import resource
+    except ImportError:
+        # Windows, ask the process memory counters instead
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def build_grid_mesh(name, triangle_count):
+    # Triangulated grid with at least triangle_count triangles, built in bulk
+    side = max(1, math.ceil(math.sqrt(max(triangle_count, 2) / 2)))
+    xs, ys = np.meshgrid(np.arange(side + 1, dtype=np.float32), np.arange(side + 1, dtype=np.float32))
+    co = np.column_stack((xs.ravel(), ys.ravel(), np.zeros(xs.size, dtype=np.float32))) / side
+
+    row = side + 1
+    corner = (np.arange(side)[:, None] * row + np.arange(side)[None, :]).ravel()
+    triangles = np.concatenate((
+        np.column_stack((corner, corner + 1, corner + row + 1)),
+        np.column_stack((corner, corner + row + 1, corner + row)),
+    )).astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", co.ravel())
+    mesh.loops.add(triangles.size)
+    mesh.loops.foreach_set("vertex_index", triangles.ravel())
+    mesh.polygons.add(len(triangles))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, triangles.size, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_total", np.full(len(triangles), 3, dtype=np.int32))
+    mesh.update()
+    mesh.validate()
+    return mesh
+
+def build_scene(collection_count, objects_per_collection, triangle_count, material_count):
+    # Start from an empty file and fill it with linked duplicates, one mesh per material
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    meshes = []
+    for m in range(max(1, material_count)):
+        mesh = build_grid_mesh(f"bench_mesh_{m:03d}", triangle_count)
+        mesh.materials.append(bpy.data.materials.new(f"bench_material_{m:03d}"))
+        meshes.append(mesh)
+
+    scene = bpy.context.scene
+    for c in range(collection_count):
+        collection = bpy.data.collections.new(f"bench_{c:04d}")
+        scene.collection.children.link(collection)
+        for o in range(objects_per_collection):
+            obj = bpy.data.objects.new(f"bench_{c:04d}_{o:04d}", meshes[(c + o) % len(meshes)])
+            obj.location = (c * 2.0, o * 2.0, 0.0)
+            collection.objects.link(obj)
+
+    # Keep a user selection around, every path has to give it back
+    for obj in list(scene.objects)[::7]:
+        obj.select_set(True)
+
+def run_mode(mode, collections, folder_path):
+    # Export every collection with one export path and collect the timings
+    exporter = batch_export.SelectionFreeExporter() if mode == "selection_free" else None
+    phases = {"selection": 0.0, "export": 0.0, "write": 0.0}
+    per_collection = []
+    failed = 0
+
+    start = time.perf_counter()
+    for collection in collections:
+        timings = {}
+        collection_start = time.perf_counter()
+        try:
+            if exporter is not None:
+                exporter.export(collection, folder_path, timings)
+            else:
+                batch_export.export_collection_as_fbx(collection, folder_path, timings)
+        except Exception as e:
+            failed += 1
+            print(f"{collection.name}: {e}")
+        file_path = batch_export.collection_fbx_path(collection, folder_path)
+        per_collection.append({
+            "collection": collection.name,
+            "seconds": time.perf_counter() - collection_start,
+            "bytes": os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+            "phases": timings,
+        })
+        for phase, seconds in timings.items():
+            phases[phase] += seconds
+
+    if exporter is not None:
+        start_restore = time.perf_counter()
+        exporter.restore()
+        phases["selection"] += time.perf_counter() - start_restore
+    total = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "total_seconds": total,
+        "ms_per_collection": total / max(len(collections), 1) * 1000,
+        "phases": phases,
+        "failed": failed,
+        "bytes_written": sum(entry["bytes"] for entry in per_collection),
+        "peak_rss_mb": peak_rss_mb(),
+        "collections": per_collection,
+    }
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    build_scene(args.collections, args.objects, args.triangles, args.materials)
+    build_seconds = time.perf_counter() - start
+    batch_export.register()
+
+    collections = list(bpy.data.collections)
+    report = {
+        "blender": bpy.app.version_string,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "scene": {
+            "collections": len(collections),
+            "objects": len(bpy.data.objects),
+            "triangles_per_object": sum(len(p.vertices) - 2 for p in bpy.data.meshes[0].polygons),
+            "materials": len(bpy.data.materials),
+            "build_seconds": build_seconds,
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "runs": [],
+    }
+
+    with tempfile.TemporaryDirectory(prefix="batch_export_bench_") as folder_path:
+        for mode in args.modes:
+            run = run_mode(mode, collections, folder_path)
+            report["runs"].append(run)
+            phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in run["phases"].items())
+            print(f"{mode:>15}: {run['total_seconds']:8.2f}s ({run['ms_per_collection']:.1f} ms/collection; {phases})")
+
+    report["peak_rss_mb"] = peak_rss_mb()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Wrote {args.output}")
+    else:
+        print(json.dumps(report, indent=1))
+
+main()
@@ -11,6 +11,90 @@ bl_info = {
     "category": "Import-Export"}
 import bpy
 import os
+import sys
+import json
+import math
+import csv
+import time
+import zlib
+import struct
+import hashlib
+import itertools
+import shutil
+import zipfile
+import tempfile
+import threading
+import subprocess
+import numpy as np
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from mathutils import Matrix
+from bpy_extras.io_utils import axis_conversion
+
+# Command line flag used to run this file as a background export worker
+WORKER_FLAG = "--batch-export-worker"
+
+# Sub folder of the export folder that receives meshes shared by several objects
+INSTANCE_FOLDER = "meshes"
+
+# Binary FBX 7.4 constants used by the fast static mesh writer. The file id,
+# creation time and footer id belong together, FBX readers check them.
+FBX_VERSION = 7400
+FBX_HEADER_MAGIC = b"Kaydara FBX Binary  \x00\x1a\x00"
+FBX_FILE_ID = b"\x28\xb3\x2a\xeb\xb6\x24\xcc\xc2\xbf\xc8\xb0\x2a\xa9\x2b\xfc\xf1"
+FBX_CREATION_TIME = "1970-01-01 10:00:00:000"
+FBX_FOOTER_ID = b"\xfa\xbc\xab\x09\xd0\xc8\xd4\x66\xb1\x76\xfb\x83\x1c\xf7\x26\x7e"
+FBX_FOOTER_MAGIC = b"\xf8\x5a\x8c\x6a\xde\xf5\xd9\x7e\xec\xe9\x0c\xe3\x75\x8f\x29\x0b"
+FBX_NULL_RECORD = b"\0" * 13
+FBX_CREATOR = "Blender - Batch Export FBX Collection"
+FBX_DOCUMENT_ID = 1000000
+FBX_FIRST_ID = 1000001
+
+# Per-collection metrics of the last export, written as .json and .csv into the export folder
+REPORT_NAME = "batch_export_report"
+REPORT_FIELDS = ("collection", "ok", "seconds", "objects", "triangles", "materials", "textures", "bytes",
+                 "lod_triangles", "error")
+
+# Persisted job queue of a batch export, lets an interrupted export be resumed
+QUEUE_NAME = ".batch_export_queue.json"
+QUEUE_VERSION = 1
+
+# Fingerprints of the last exported collections, kept inside the export folder
+MANIFEST_NAME = ".batch_export_manifest.json"
+MANIFEST_VERSION = 3
+# Export settings that change which files an export writes or what goes into them
+FINGERPRINT_SETTINGS = ("export_scope", "include_collections", "use_selection_free", "use_instancing",
+                        "instance_match", "use_merge_by_material", "use_lods", "lod_ratios", "lod_layout",
+                        "use_fast_writer")
+# foreach_get key, components and dtype of every mesh attribute type a fingerprint reads
+ATTRIBUTE_LAYOUTS = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT2': ("vector", 2, np.float32),
+    'INT32_2D': ("value", 2, np.int32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+    'QUATERNION': ("value", 4, np.float32),
+}
+
+# Index of the members of an export archive, stored as the last member of the archive
+ARCHIVE_MANIFEST_NAME = "manifest.json"
+ARCHIVE_VERSION = 2
+# Collection the manifest lists files under that belong to no single collection
+ARCHIVE_SHARED_COLLECTION = "shared"
+
+class BatchExportReportItem(bpy.types.PropertyGroup):
+    # name holds the collection name
+    ok: bpy.props.BoolProperty(name="OK")
+    seconds: bpy.props.FloatProperty(name="Time")
+    objects: bpy.props.IntProperty(name="Objects")
+    triangles: bpy.props.IntProperty(name="Triangles")
+    materials: bpy.props.IntProperty(name="Materials")
+    textures: bpy.props.IntProperty(name="Textures")
+    size_mb: bpy.props.FloatProperty(name="Size (MB)")
 
 class BatchExportSettings(bpy.types.PropertyGroup):
     obj_folder_path: bpy.props.StringProperty(
@@ -18,6 +102,189 @@ class BatchExportSettings(bpy.types.PropertyGroup):
         subtype='DIR_PATH',
         default="",  # Set default to an empty string
     )
+    use_parallel: bpy.props.BoolProperty(
+        name="Parallel Export",
+        description="Save a snapshot of the file and export the collections in background Blender worker processes",
+        default=False,
+    )
+    worker_count: bpy.props.IntProperty(
+        name="Workers",
+        description="Number of background Blender processes used by the parallel export",
+        default=4,
+        min=1,
+        max=64,
+    )
+    use_incremental: bpy.props.BoolProperty(
+        name="Incremental Export",
+        description="Only export collections that changed since the last export or whose FBX file is missing",
+        default=False,
+    )
+    use_selection_free: bpy.props.BoolProperty(
+        name="Keep Selection",
+        description="Export each collection through the active collection instead of changing the selection "
+                    "(objects of child collections are included). Collections outside the view layer still use the selection",
+        default=False,
+    )
+    export_scope: bpy.props.EnumProperty(
+        name="Scope",
+        description="Which collections are exported",
+        items=(
+            ('ALL', "All Collections", "Every collection in the file, including nested, orphaned and linked ones"),
+            ('TOP_LEVEL', "Top-Level", "Collections directly under the scene collection, together with their nested collections"),
+            ('LEAF', "Leaf", "Collections of the scene that have no child collections"),
+            ('INCLUDE', "Include List", "Only the collections named in the include list"),
+        ),
+        default='ALL',
+    )
+    include_collections: bpy.props.StringProperty(
+        name="Include",
+        description="Comma separated names of the collections to export",
+        default="",
+    )
+    use_instancing: bpy.props.BoolProperty(
+        name="Write Shared Meshes Once",
+        description="Export meshes used by several objects once into the meshes folder and place "
+                    "the objects through a <collection>.instances.json table instead",
+        default=False,
+    )
+    instance_match: bpy.props.EnumProperty(
+        name="Match",
+        description="How objects sharing a mesh are found",
+        items=(
+            ('DATA', "Mesh Data", "Objects using the same mesh datablock (linked duplicates)"),
+            ('CONTENT', "Content", "Objects whose meshes have identical geometry and materials"),
+        ),
+        default='DATA',
+    )
+    use_merge_by_material: bpy.props.BoolProperty(
+        name="Merge by Material",
+        description="Join the static meshes of each collection that share a material into one mesh before "
+                    "exporting. Works on temporary copies. Not used together with shared meshes",
+        default=False,
+    )
+    use_lods: bpy.props.BoolProperty(
+        name="Generate LODs",
+        description="Export a chain of decimated LOD levels for every collection. "
+                    "Not used together with shared meshes or merging by material",
+        default=False,
+    )
+    lod_ratios: bpy.props.StringProperty(
+        name="Ratios",
+        description="Comma separated triangle ratios of the LOD levels, starting with LOD0",
+        default="1.0, 0.5, 0.25",
+    )
+    lod_layout: bpy.props.EnumProperty(
+        name="LOD Layout",
+        description="How the LOD levels are written",
+        items=(
+            ('FILES', "One File per Level", "Write <collection>_LOD0.fbx, <collection>_LOD1.fbx, ..."),
+            ('GROUP', "LOD Group", "Write all levels into <collection>.fbx with objects named <object>_LOD<n>"),
+        ),
+        default='FILES',
+    )
+    use_fast_writer: bpy.props.BoolProperty(
+        name="Fast Static Mesh Writer",
+        description="Write collections of plain static meshes directly as binary FBX with bulk array reads. "
+                    "Collections with other object types, hierarchies, animation, shape keys or complex "
+                    "materials use the regular exporter. Not used together with shared meshes",
+        default=False,
+    )
+    mesh_cache_mb: bpy.props.IntProperty(
+        name="Mesh Cache (MB)",
+        description="Memory the fast writer and merge by material may use to keep evaluated meshes of objects "
+                    "that appear in several collections, least recently used meshes are dropped first. 0 disables the cache",
+        default=512,
+        min=0,
+    )
+    grid_collection: bpy.props.PointerProperty(
+        name="Map Collection",
+        description="Collection split into grid cells by the grid export, nested collections included",
+        type=bpy.types.Collection,
+    )
+    grid_cell_size: bpy.props.FloatProperty(
+        name="Cell Size",
+        description="Edge length of the square grid cells on the ground plane",
+        default=100.0,
+        min=0.01,
+        subtype='DISTANCE',
+    )
+    grid_straddle_rule: bpy.props.EnumProperty(
+        name="Straddling Objects",
+        description="Which cell gets an object whose bounds cross cell borders",
+        items=(
+            ('CENTER', "Bounds Center", "The cell containing the center of the object's bounds"),
+            ('MIN_CORNER', "Bounds Minimum", "The cell containing the lowest X/Y corner of the object's bounds"),
+        ),
+        default='CENTER',
+    )
+    use_job_queue: bpy.props.BoolProperty(
+        name="Resumable Export",
+        description="Keep a job queue in the export folder, updated after every collection, so an "
+                    "interrupted export can be resumed",
+        default=False,
+    )
+    max_retries: bpy.props.IntProperty(
+        name="Retries",
+        description="How often Resume retries a collection that failed",
+        default=2,
+        min=0,
+    )
+    retry_backoff: bpy.props.FloatProperty(
+        name="Backoff",
+        description="Wait before the first retry of a failed collection, doubled for every further attempt",
+        default=1.0,
+        min=0.0,
+        subtype='TIME',
+        unit='TIME',
+    )
+    use_budgets: bpy.props.BoolProperty(
+        name="Enforce Budgets",
+        description="Check the triangles, vertices and texture memory of every collection before exporting",
+        default=False,
+    )
+    budget_triangles: bpy.props.IntProperty(
+        name="Triangles",
+        description="Most evaluated triangles a collection may have, 0 for no limit",
+        default=500000,
+        min=0,
+    )
+    budget_vertices: bpy.props.IntProperty(
+        name="Vertices",
+        description="Most evaluated vertices a collection may have, 0 for no limit",
+        default=500000,
+        min=0,
+    )
+    budget_texture_mb: bpy.props.FloatProperty(
+        name="Texture MB",
+        description="Most uncompressed texture memory a collection may use, 0 for no limit",
+        default=256.0,
+        min=0.0,
+    )
+    budget_action: bpy.props.EnumProperty(
+        name="Over Budget",
+        description="What happens to collections over budget",
+        items=(
+            ('WARN', "Warn", "Report the collection and export it anyway"),
+            ('BLOCK', "Block", "Report the collection and leave it out of the export"),
+        ),
+        default='WARN',
+    )
+    use_archive: bpy.props.BoolProperty(
+        name="Export Archive",
+        description="Stream every exported file into one zip archive in the export folder instead of loose files, "
+                    "files are compressed in the background while the next collection exports",
+        default=False,
+    )
+    archive_name: bpy.props.StringProperty(
+        name="Archive Name",
+        description="File name of the export archive, without the .zip extension",
+        default="batch_export",
+    )
+    write_report: bpy.props.BoolProperty(
+        name="Write Report",
+        description="Collect per-collection metrics and write them as batch_export_report.json/.csv into the export folder",
+        default=True,
+    )
 
 class BatchExportOperator(bpy.types.Operator):
     """Batch Export Operator"""
@@ -26,12 +293,284 @@ class BatchExportOperator(bpy.types.Operator):
 
     def execute(self, context):
         # Get the folder path from the property group
-        folder_path = bpy.context.scene.batch_export_settings.obj_folder_path
+        settings = bpy.context.scene.batch_export_settings
+        folder_path = bpy.path.abspath(settings.obj_folder_path)
+
+        collections = collections_in_scope(self, context.scene, settings)
+        report_duplicate_objects(self, collections)
+        collections = apply_budgets(self, context, collections, settings)
+        start = time.perf_counter()
+
+        # Leave out collections whose content matches the last export. The archive
+        # is written from scratch every time, so it always takes every collection.
+        skipped = 0
+        use_incremental = settings.use_incremental and not settings.use_archive
+        if use_incremental:
+            stale, manifest, fingerprints = filter_stale_collections(collections, folder_path, settings)
+            skipped = len(collections) - len(stale)
+            collections = stale
+
+        # Exporters write into the archive's staging folder, it empties as files are archived
+        archive = ExportArchive(folder_path, settings.archive_name) if settings.use_archive else None
+        export_folder = archive.staging_path if archive is not None else folder_path
+
+        # Start a fresh queue, it is checkpointed after every collection
+        queue = None
+        if settings.use_job_queue:
+            queue = ExportQueue.create(folder_path, [collection.name for collection in collections])
+
+        # Export each collection as FBX, the archive is only published when the export completes
+        try:
+            instance_files = prepare_instancing(self, collections, export_folder, settings)
+            results = run_export(collections, export_folder, settings, instance_files, queue, archive)
+        except BaseException:
+            if archive is not None:
+                archive.abort()
+            raise
+        if archive is not None:
+            archive.close()
+
+        if use_incremental:
+            update_export_manifest(folder_path, manifest, fingerprints, results)
+
+        if settings.write_report:
+            record_export_report(context, results, folder_path)
+
+        report_results(self, results, time.perf_counter() - start, skipped)
+        return {'FINISHED'}
+
+class BatchExportResumeOperator(bpy.types.Operator):
+    """Continue an interrupted batch export from the job queue in the export folder and retry failed collections"""
+    bl_idname = "obj.batch_export_resume"
+    bl_label = "Resume Export"
+
+    def execute(self, context):
+        settings = context.scene.batch_export_settings
+        folder_path = bpy.path.abspath(settings.obj_folder_path)
+        queue = ExportQueue.load(folder_path)
+        if queue is None:
+            self.report({'ERROR'}, "No export queue found in the export folder")
+            return {'CANCELLED'}
+
+        collections = []
+        for name in queue.remaining(settings.max_retries):
+            collection = bpy.data.collections.get(name)
+            if collection is None:
+                queue.record({"collection": name, "ok": False, "error": "collection not found"})
+                continue
+            collections.append(collection)
+        collections = apply_budgets(self, context, collections, settings)
+        if not collections:
+            self.report({'INFO'}, "Nothing left to resume")
+            return {'FINISHED'}
+
+        start = time.perf_counter()
+        instance_files = prepare_instancing(self, collections, folder_path, settings)
+        results = run_export(collections, folder_path, settings, instance_files, queue)
+
+        if settings.use_incremental:
+            fingerprints = collection_fingerprints(collections, settings)
+            update_export_manifest(folder_path, load_export_manifest(folder_path), fingerprints, results)
+
+        if settings.write_report:
+            record_export_report(context, results, folder_path)
+
+        report_results(self, results, time.perf_counter() - start)
+        return {'FINISHED'}
+
+class BatchExportGridOperator(bpy.types.Operator):
+    """Split a map collection into square grid cells and export every cell as its own FBX"""
+    bl_idname = "obj.batch_export_grid"
+    bl_label = "Export Grid Cells"
+
+    def execute(self, context):
+        settings = context.scene.batch_export_settings
+        collection = settings.grid_collection
+        if collection is None:
+            self.report({'ERROR'}, "Pick a map collection to split")
+            return {'CANCELLED'}
+
+        folder_path = bpy.path.abspath(settings.obj_folder_path)
+        start = time.perf_counter()
+        results = export_grid_cells(collection, folder_path, settings)
+        report_results(self, results, time.perf_counter() - start)
+        return {'FINISHED'}
+
+class BatchExportCheckBudgetsOperator(bpy.types.Operator):
+    """Compare the triangles, vertices and texture memory of every collection in the export scope with the budgets"""
+    bl_idname = "obj.batch_export_check_budgets"
+    bl_label = "Check Budgets"
+
+    def execute(self, context):
+        settings = context.scene.batch_export_settings
+        collections = collections_in_scope(self, context.scene, settings)
+        start = time.perf_counter()
+        over = find_collections_over_budget(self, context, collections, settings)
+        elapsed = time.perf_counter() - start
+        self.report({'INFO'}, f"{len(over)}/{len(collections)} collections over budget, checked in {elapsed:.2f}s")
+        return {'FINISHED'}
+
+class BatchExportCheckScopeOperator(bpy.types.Operator):
+    """List the collections in the export scope and the objects that would be written more than once"""
+    bl_idname = "obj.batch_export_check_scope"
+    bl_label = "Check Scope"
+
+    def execute(self, context):
+        collections = collections_in_scope(self, context.scene, context.scene.batch_export_settings)
+        for collection in collections:
+            print(f"{collection.name}: {len(collection_export_objects(collection))} objects")
+        if not report_duplicate_objects(self, collections):
+            self.report({'INFO'}, f"{len(collections)} collections, no object is written twice")
+        return {'FINISHED'}
+
+class ExportProgress:
+    """Progress of the running modal batch export"""
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.bytes_written = 0
+        self.current = ""
+        self.start = time.perf_counter()
+
+    def add(self, result):
+        self.done += 1
+        if "bytes" in result:
+            self.bytes_written += result["bytes"]
+        elif result["ok"] and os.path.exists(result["file"]):
+            self.bytes_written += os.path.getsize(result["file"])
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def collections_per_second(self):
+        return self.done / max(self.elapsed(), 1e-6)
+
+    def megabytes_per_second(self):
+        return self.bytes_written / (1024 * 1024) / max(self.elapsed(), 1e-6)
+
+    def eta(self):
+        if self.done == 0:
+            return None
+        return (self.total - self.done) / self.collections_per_second()
+
+# Progress of the modal export shown by the panel, None while no export is running
+modal_progress = None
+
+class BatchExportModalOperator(bpy.types.Operator):
+    """Export one collection per timer tick while Blender stays usable, press Esc to cancel"""
+    bl_idname = "obj.batch_export_modal"
+    bl_label = "Batch Export (Modal)"
+
+    def execute(self, context):
+        global modal_progress
+        if modal_progress is not None:
+            self.report({'WARNING'}, "A batch export is already running")
+            return {'CANCELLED'}
+
+        settings = context.scene.batch_export_settings
+        self.folder_path = bpy.path.abspath(settings.obj_folder_path)
+        collections = collections_in_scope(self, context.scene, settings)
+        report_duplicate_objects(self, collections)
+        collections = apply_budgets(self, context, collections, settings)
+
+        self.skipped = 0
+        self.manifest = None
+        self.write_report = settings.write_report
+        if settings.use_incremental and not settings.use_archive:
+            stale, self.manifest, self.fingerprints = filter_stale_collections(collections, self.folder_path, settings)
+            self.skipped = len(collections) - len(stale)
+            collections = stale
+
+        self.archive = ExportArchive(self.folder_path, settings.archive_name) if settings.use_archive else None
+        self.export_folder = self.archive.staging_path if self.archive is not None else self.folder_path
+        instance_files = prepare_instancing(self, collections, self.export_folder, settings)
 
-        # Export each collection as FBX
-        for collection in bpy.data.collections:
-            export_collection_as_fbx(collection, folder_path)
+        # Keep names only, the user may delete collections while we run
+        self.names = [collection.name for collection in collections]
+        self.queue = ExportQueue.create(self.folder_path, self.names) if settings.use_job_queue else None
+        self.results = []
+        self.exporter = make_collection_exporter(settings, instance_files, interactive=True)
 
+        modal_progress = ExportProgress(len(self.names))
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.01, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            return self.finish(context, cancelled=True)
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        # Exporting needs Object Mode, wait while the user edits a mesh or paints
+        if context.mode != 'OBJECT':
+            return {'PASS_THROUGH'}
+        if modal_progress.done >= modal_progress.total:
+            return self.finish(context)
+
+        name = self.names[modal_progress.done]
+        modal_progress.current = name
+        collection = bpy.data.collections.get(name)
+        if collection is None:
+            result = {
+                "collection": name,
+                "file": os.path.join(self.export_folder, f"{name}.fbx"),
+                "ok": False,
+                "error": "collection was removed during the export",
+                "seconds": 0.0,
+            }
+        else:
+            result = export_collection_with_result(collection, self.export_folder, self.exporter.export)
+
+        self.results.append(result)
+        try:
+            if self.queue is not None:
+                self.queue.record(result)
+            if self.archive is not None:
+                self.archive.record(result)
+        except Exception as e:
+            # E.g. a full disk, stop like a cancel instead of leaving the export half running
+            self.report({'ERROR'}, f"Batch export stopped: {e}")
+            return self.finish(context, cancelled=True)
+        modal_progress.add(result)
+        redraw_view3d(context)
+        return {'RUNNING_MODAL'}
+
+    def cancel(self, context):
+        # Blender ends the operator itself, e.g. on file load or when the window closes
+        self.finish(context, cancelled=True)
+
+    def finish(self, context, cancelled=False):
+        global modal_progress
+        elapsed = modal_progress.elapsed()
+        # Whatever fails below, the timer, the archive and the running state are cleaned up
+        try:
+            context.window_manager.event_timer_remove(self._timer)
+            try:
+                self.exporter.restore()
+            finally:
+                if self.archive is not None:
+                    if cancelled:
+                        self.archive.abort()
+                        self.report({'WARNING'}, "Export archive discarded, the previous archive was kept")
+                    else:
+                        self.archive.close()
+
+            # Files written so far stay on disk and count as exported
+            if self.manifest is not None:
+                update_export_manifest(self.folder_path, self.manifest, self.fingerprints, self.results)
+
+            if self.write_report:
+                record_export_report(context, self.results, self.folder_path)
+        finally:
+            modal_progress = None
+            redraw_view3d(context)
+
+        report_results(self, self.results, elapsed, self.skipped)
+        if cancelled:
+            self.report({'WARNING'}, f"Batch export cancelled after {len(self.results)} collections")
+            return {'CANCELLED'}
         return {'FINISHED'}
 
 class BatchExportPanel(bpy.types.Panel):
@@ -43,12 +582,146 @@ class BatchExportPanel(bpy.types.Panel):
     bl_category = 'Tool'
 
     def draw(self, context):
+        settings = context.scene.batch_export_settings
         layout = self.layout
         layout.label(text="Select a folder Directory:")
         row = layout.row()
-        row.prop(context.scene.batch_export_settings, "obj_folder_path", text="Dir")
+        row.prop(settings, "obj_folder_path", text="Dir")
         row.operator("obj.batch_export", text="", icon="PLAY")
 
+        row = layout.row(align=True)
+        row.prop(settings, "export_scope")
+        row.operator("obj.batch_export_check_scope", text="", icon="VIEWZOOM")
+        if settings.export_scope == 'INCLUDE':
+            layout.prop(settings, "include_collections")
+
+        row = layout.row()
+        row.prop(settings, "use_parallel")
+        sub = row.row()
+        sub.enabled = settings.use_parallel
+        sub.prop(settings, "worker_count")
+        layout.prop(settings, "use_incremental")
+        layout.prop(settings, "use_selection_free")
+        row = layout.row()
+        row.prop(settings, "use_instancing")
+        sub = row.row()
+        sub.enabled = settings.use_instancing
+        sub.prop(settings, "instance_match", text="")
+        layout.prop(settings, "use_merge_by_material")
+        row = layout.row()
+        row.prop(settings, "use_lods")
+        sub = row.row()
+        sub.enabled = settings.use_lods
+        sub.prop(settings, "lod_layout", text="")
+        if settings.use_lods:
+            layout.prop(settings, "lod_ratios")
+        row = layout.row()
+        row.prop(settings, "use_fast_writer")
+        row.prop(settings, "mesh_cache_mb", text="Cache MB")
+        row = layout.row()
+        row.prop(settings, "use_archive")
+        sub = row.row()
+        sub.enabled = settings.use_archive
+        sub.prop(settings, "archive_name", text="")
+        layout.prop(settings, "write_report")
+
+        box = layout.box()
+        row = box.row()
+        row.prop(settings, "use_budgets")
+        row.operator("obj.batch_export_check_budgets", text="", icon="CHECKMARK")
+        col = box.column(align=True)
+        col.enabled = settings.use_budgets
+        col.prop(settings, "budget_triangles")
+        col.prop(settings, "budget_vertices")
+        col.prop(settings, "budget_texture_mb")
+        col.prop(settings, "budget_action")
+
+        row = layout.row()
+        row.prop(settings, "use_job_queue")
+        row.operator("obj.batch_export_resume", icon="RECOVER_LAST")
+        row = layout.row()
+        row.prop(settings, "max_retries")
+        row.prop(settings, "retry_backoff")
+
+        box = layout.box()
+        box.label(text="Grid Export:")
+        box.prop(settings, "grid_collection")
+        row = box.row()
+        row.prop(settings, "grid_cell_size")
+        row.prop(settings, "grid_straddle_rule", text="")
+        box.operator("obj.batch_export_grid", icon="MESH_GRID")
+
+        if modal_progress is None:
+            layout.operator("obj.batch_export_modal", icon="TIME")
+        else:
+            self.draw_progress(layout)
+
+        # Metrics of the last export, sortable from the list's filter options
+        scene = context.scene
+        if scene.batch_export_report:
+            layout.label(text="Last Export:")
+            layout.template_list("BATCHEXPORT_UL_report", "", scene, "batch_export_report",
+                                 scene, "batch_export_report_index")
+
+    def draw_progress(self, layout):
+        # Progress of the running modal export
+        box = layout.box()
+        factor = modal_progress.done / max(modal_progress.total, 1)
+        text = f"{modal_progress.done}/{modal_progress.total} collections"
+        if hasattr(box, "progress"):
+            box.progress(factor=factor, text=text)
+        else:
+            box.label(text=f"{text} ({factor * 100:.0f}%)")
+        box.label(text=f"Current: {modal_progress.current}")
+        box.label(text=f"{modal_progress.collections_per_second():.2f} collections/s, "
+                       f"{modal_progress.megabytes_per_second():.2f} MB/s")
+        eta = modal_progress.eta()
+        box.label(text=f"ETA: {eta:.0f}s" if eta is not None else "ETA: estimating...")
+        box.label(text="Press Esc to cancel", icon="CANCEL")
+
+class BATCHEXPORT_UL_report(bpy.types.UIList):
+    """Per-collection metrics of the last batch export"""
+    sort_key: bpy.props.EnumProperty(
+        name="Sort By",
+        items=(
+            ('seconds', "Time", "Export duration"),
+            ('triangles', "Triangles", "Evaluated triangle count"),
+            ('size_mb', "Size", "Size of the written file"),
+            ('objects', "Objects", "Number of objects"),
+            ('materials', "Materials", "Number of materials"),
+            ('textures', "Textures", "Number of textures"),
+            ('name', "Name", "Collection name"),
+        ),
+        default='seconds',
+    )
+
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.label(text=item.name, icon='OUTLINER_COLLECTION' if item.ok else 'ERROR')
+        row.label(text=f"{item.seconds:.2f}s")
+        row.label(text=f"{item.triangles:,} tris")
+        row.label(text=f"{item.size_mb:.1f} MB")
+
+    def draw_filter(self, context, layout):
+        row = layout.row()
+        row.prop(self, "filter_name", text="")
+        row.prop(self, "sort_key", text="")
+        row.prop(self, "use_filter_sort_reverse", text="", icon="SORT_DESC")
+
+    def filter_items(self, context, data, propname):
+        items = getattr(data, propname)
+        flags = [self.bitflag_filter_item] * len(items)
+        if self.filter_name:
+            flags = bpy.types.UI_UL_list.filter_items_by_name(self.filter_name, self.bitflag_filter_item, items, "name")
+
+        # Biggest first for the numbers, alphabetical for names
+        keys = [getattr(item, self.sort_key) for item in items]
+        ranking = sorted(range(len(items)), key=keys.__getitem__, reverse=self.sort_key != 'name')
+        order = [0] * len(items)
+        for position, index in enumerate(ranking):
+            order[index] = position
+        return flags, order
+
 def get_selected_objects():
     # Get the selected objects in the scene
     selected_objects = [obj for obj in bpy.context.selected_objects]
@@ -62,26 +735,1796 @@ def select_objects(objects):
     for obj in objects:
         obj.select_set(True)
 
-def export_collection_as_fbx(collection, folder_path):
+def collection_export_objects(collection):
+    # Objects written for a collection. Top-level exports and the active
+    # collection path also write the objects of nested collections.
+    settings = bpy.context.scene.batch_export_settings
+    if settings.export_scope == 'TOP_LEVEL' or settings.use_selection_free:
+        return collection.all_objects
+    return collection.objects
+
+def collections_in_scope(operator, scene, settings):
+    # Collections to export for the chosen scope, in a stable order
+    if settings.export_scope == 'TOP_LEVEL':
+        return list(scene.collection.children)
+    if settings.export_scope == 'LEAF':
+        leaves = [c for c in scene.collection.children_recursive if not c.children]
+        return list(dict.fromkeys(leaves))
+    if settings.export_scope == 'INCLUDE':
+        collections = []
+        for name in (name.strip() for name in settings.include_collections.split(",")):
+            if not name:
+                continue
+            collection = bpy.data.collections.get(name)
+            if collection is None:
+                operator.report({'WARNING'}, f"Collection not found: {name}")
+                continue
+            collections.append(collection)
+        return list(dict.fromkeys(collections))
+    return list(bpy.data.collections)
+
+def find_duplicate_objects(collections):
+    # Objects that end up in more than one exported file, with the collections writing them
+    owners = {}
+    for collection in collections:
+        for obj in collection_export_objects(collection):
+            owners.setdefault(obj.name, []).append(collection.name)
+    return {name: names for name, names in owners.items() if len(names) > 1}
+
+def report_duplicate_objects(operator, collections):
+    # Warn about objects written more than once, returns how many there are
+    duplicates = find_duplicate_objects(collections)
+    for name, names in sorted(duplicates.items()):
+        print(f"{name} is written by {len(names)} collections: {', '.join(names)}")
+    if duplicates:
+        operator.report({'WARNING'}, f"{len(duplicates)} objects are written more than once, see the console")
+    return len(duplicates)
+
+def collection_fbx_path(collection, folder_path):
+    # Output file of a collection inside the export folder
+    return os.path.join(folder_path, f"{collection.name}.fbx")
+
+def add_timing(timings, phase, start):
+    # Accumulate the time since start into a phase of an optional timings dict
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+def flush_file(file_path, timings):
+    # Force a written file out to disk, only done when timings are collected
+    # so the benchmark can tell exporter time and disk write time apart
+    if timings is None:
+        return
+    start = time.perf_counter()
+    with open(file_path, "rb+") as f:
+        os.fsync(f.fileno())
+    add_timing(timings, "write", start)
+
+def export_collection_as_fbx(collection, folder_path, timings=None):
+    # Export the objects of a collection into its FBX file
+    file_path = collection_fbx_path(collection, folder_path)
+    export_objects_as_fbx(collection_export_objects(collection), file_path, timings)
+
+def partial_path(file_path):
+    # Temporary name a file is written under before it replaces the real one
+    folder, name = os.path.split(file_path)
+    return os.path.join(folder, f".partial_{name}")
+
+def export_fbx_file(file_path, **options):
+    # Run the FBX exporter into a temporary file and move it over the real one
+    # once complete, so a failed export never replaces a good file with a partial one
+    temp_path = partial_path(file_path)
+    try:
+        bpy.ops.export_scene.fbx(filepath=temp_path, **options)
+        os.replace(temp_path, file_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def export_objects_as_fbx(objects, file_path, timings=None):
     # Get the selected objects before exporting
+    start = time.perf_counter()
     selected_objects = get_selected_objects()
 
-    # Select objects in the collection
-    select_objects(collection.objects)
-
-    # Set the export file path
-    file_path = os.path.join(folder_path, f"{collection.name}.fbx")
+    # Select the objects to export
+    select_objects(objects)
+    add_timing(timings, "selection", start)
 
-    # Export the collection as FBX
-    bpy.ops.export_scene.fbx(filepath=file_path, use_selection=True)
+    # Export the selection as FBX
+    start = time.perf_counter()
+    export_fbx_file(file_path, use_selection=True)
+    add_timing(timings, "export", start)
+    flush_file(file_path, timings)
 
     # Restore the original selection
+    start = time.perf_counter()
     select_objects(selected_objects)
+    add_timing(timings, "selection", start)
+
+def build_layer_collection_index(view_layer):
+    # Map collection names to their layer collections, nested ones included
+    index = {}
+    pending = [view_layer.layer_collection]
+    while pending:
+        layer_collection = pending.pop()
+        index[layer_collection.collection.name] = layer_collection
+        pending.extend(layer_collection.children)
+    return index
+
+class SelectionFreeExporter:
+    """Hand each collection to the exporter as the active collection, so the
+    selection is never touched. Collections that are not part of the view layer
+    fall back to being selected, the selection is then restored once in restore(),
+    or right after each such export with restore_each while the user keeps working."""
+
+    def __init__(self, restore_each=False):
+        self.view_layer = bpy.context.view_layer
+        self.layer_index = build_layer_collection_index(self.view_layer)
+        self.restore_each = restore_each
+        self.selected_objects = []
+        self.selection_changed = False
+
+    def export(self, collection, folder_path, timings=None):
+        file_path = collection_fbx_path(collection, folder_path)
+        layer_collection = self.layer_index.get(collection.name)
+        if layer_collection is None or layer_collection.exclude:
+            start = time.perf_counter()
+            # The selection as it is now, not as it was when the export started
+            if not self.selection_changed:
+                self.selected_objects = get_selected_objects()
+            select_objects(collection_export_objects(collection))
+            self.selection_changed = True
+            add_timing(timings, "selection", start)
+
+            start = time.perf_counter()
+            try:
+                export_fbx_file(file_path, use_selection=True)
+            finally:
+                if self.restore_each:
+                    self.restore()
+            add_timing(timings, "export", start)
+            flush_file(file_path, timings)
+            return
+
+        start = time.perf_counter()
+        active_layer_collection = self.view_layer.active_layer_collection
+        self.view_layer.active_layer_collection = layer_collection
+        add_timing(timings, "selection", start)
+        try:
+            start = time.perf_counter()
+            export_fbx_file(file_path, use_active_collection=True)
+            add_timing(timings, "export", start)
+        finally:
+            self.view_layer.active_layer_collection = active_layer_collection
+        flush_file(file_path, timings)
+
+    def restore(self):
+        if self.selection_changed:
+            select_objects(self.selected_objects)
+            self.selection_changed = False
+
+class SelectionExporter:
+    """Export each collection by selecting its objects, the default path"""
+
+    def export(self, collection, folder_path, timings=None):
+        export_collection_as_fbx(collection, folder_path, timings)
+
+    def restore(self):
+        pass
+
+def instance_key(obj, match, mesh_digests):
+    # Key under which objects can share one exported mesh, None when the
+    # object's geometry depends on more than its mesh datablock
+    if obj.type != 'MESH' or obj.modifiers or obj.children:
+        return None
+    if match == 'CONTENT':
+        if obj.data.name_full not in mesh_digests:
+            digest = hashlib.sha1()
+            hash_mesh(obj.data, digest)
+            mesh_digests[obj.data.name_full] = digest.hexdigest()
+        mesh_key = mesh_digests[obj.data.name_full]
+    else:
+        mesh_key = obj.data.name_full
+    materials = tuple(slot.material.name_full if slot.material else "" for slot in obj.material_slots)
+    return mesh_key, materials
+
+def find_instance_groups(collections, match):
+    # Lists of objects across all exported collections that share one mesh
+    groups = {}
+    seen = set()
+    mesh_digests = {}
+    for collection in collections:
+        for obj in collection_export_objects(collection):
+            if obj.name in seen:
+                continue
+            seen.add(obj.name)
+            key = instance_key(obj, match, mesh_digests)
+            if key is not None:
+                groups.setdefault(key, []).append(obj)
+    return [objects for objects in groups.values() if len(objects) > 1]
+
+def mesh_payload_bytes(mesh):
+    # Rough size of the geometry the FBX exporter writes for a mesh
+    return (len(mesh.vertices) * 24
+            + len(mesh.loops) * (4 + 24 + 16 * len(mesh.uv_layers))
+            + len(mesh.polygons) * 4)
+
+def export_mesh_once(source, file_path):
+    # Export the mesh of an object at the origin through a temporary object
+    temp_collection = bpy.data.collections.new("batch_export_instance")
+    bpy.context.scene.collection.children.link(temp_collection)
+    temp_object = bpy.data.objects.new(source.data.name, source.data)
+    temp_collection.objects.link(temp_object)
+    for slot, source_slot in zip(temp_object.material_slots, source.material_slots):
+        slot.link = source_slot.link
+        slot.material = source_slot.material
+    try:
+        export_objects_as_fbx([temp_object], file_path)
+    finally:
+        bpy.data.objects.remove(temp_object)
+        bpy.data.collections.remove(temp_collection)
+
+def export_instance_meshes(collections, folder_path, match):
+    # Write every shared mesh once into the meshes folder.
+    # Returns object name -> mesh file (relative to the export folder) and the bytes saved.
+    instance_files = {}
+    saved_bytes = 0
+    used_names = set()
+    for objects in find_instance_groups(collections, match):
+        source = objects[0]
+        name = bpy.path.clean_name(source.data.name)
+        unique_name = name
+        suffix = 1
+        while unique_name in used_names:
+            unique_name = f"{name}_{suffix}"
+            suffix += 1
+        used_names.add(unique_name)
+
+        relative_path = f"{INSTANCE_FOLDER}/{unique_name}.fbx"
+        os.makedirs(os.path.join(folder_path, INSTANCE_FOLDER), exist_ok=True)
+        export_mesh_once(source, os.path.join(folder_path, relative_path))
+        for obj in objects:
+            instance_files[obj.name] = relative_path
+        saved_bytes += (len(objects) - 1) * mesh_payload_bytes(source.data)
+    return instance_files, saved_bytes
+
+def prepare_instancing(operator, collections, folder_path, settings):
+    # Write the shared meshes before the collections when instancing is enabled
+    if not settings.use_instancing:
+        return None
+    instance_files, saved_bytes = export_instance_meshes(collections, folder_path, settings.instance_match)
+    mesh_count = len(set(instance_files.values()))
+    operator.report({'INFO'}, f"{mesh_count} shared meshes written once for {len(instance_files)} objects, "
+                              f"about {saved_bytes / (1024 * 1024):.1f} MB of geometry saved")
+    return instance_files
+
+class InstancingExporter:
+    """Export each collection without the objects whose mesh went to the meshes
+    folder, those are placed through a <collection>.instances.json table"""
+
+    def __init__(self, instance_files):
+        self.instance_files = instance_files
+
+    def export(self, collection, folder_path, timings=None):
+        objects = collection_export_objects(collection)
+        placed = [obj for obj in objects if obj.name in self.instance_files]
+        remaining = [obj for obj in objects if obj.name not in self.instance_files]
+        export_objects_as_fbx(remaining, collection_fbx_path(collection, folder_path), timings)
+
+        table_path = os.path.join(folder_path, f"{collection.name}.instances.json")
+        if not placed:
+            if os.path.exists(table_path):
+                os.remove(table_path)
+            return
+        table = {
+            "collection": collection.name,
+            "space": "Blender world space, Z up, meters",
+            "instances": [{
+                "object": obj.name,
+                "mesh": self.instance_files[obj.name],
+                "matrix": [list(row) for row in obj.matrix_world],
+            } for obj in placed],
+        }
+        with open(table_path, "w") as f:
+            json.dump(table, f, indent=1)
+
+    def restore(self):
+        pass
+
+class FBXNode:
+    """Element of a binary FBX document, properties are stored already encoded"""
+
+    def __init__(self, name, *props):
+        self.name = name.encode()
+        self.props = list(props)
+        self.children = []
+
+    def add(self, name, *props):
+        node = FBXNode(name, *props)
+        self.children.append(node)
+        return node
+
+    def add_property(self, name, type_name, label, flags, *values):
+        # One P entry of a Properties70 block
+        return self.add("P", fbx_str(name), fbx_str(type_name), fbx_str(label), fbx_str(flags), *values)
+
+    def write(self, f, is_last):
+        # Node record of FBX 7.4: end offset, property count, property size, name
+        start = f.tell()
+        props = b"".join(self.props)
+        f.write(struct.pack("<3I", 0, len(self.props), len(props)))
+        f.write(bytes((len(self.name),)))
+        f.write(self.name)
+        f.write(props)
+        self.write_children(f, is_last)
+
+        end = f.tell()
+        f.seek(start)
+        f.write(struct.pack("<I", end))
+        f.seek(end)
+
+    def write_children(self, f, is_last):
+        # Nested nodes end with a null record, so do empty nodes that aren't last
+        if self.children:
+            for child in self.children:
+                child.write(f, child is self.children[-1])
+            f.write(FBX_NULL_RECORD)
+        elif not self.props and not is_last:
+            f.write(FBX_NULL_RECORD)
+
+def fbx_i32(value):
+    return b"I" + struct.pack("<i", value)
+
+def fbx_i64(value):
+    return b"L" + struct.pack("<q", value)
+
+def fbx_f64(value):
+    return b"D" + struct.pack("<d", value)
+
+def fbx_bool(value):
+    return b"C" + struct.pack("<?", value)
+
+def fbx_str(value):
+    data = value.encode() if isinstance(value, str) else value
+    return b"S" + struct.pack("<I", len(data)) + data
+
+def fbx_raw(value):
+    return b"R" + struct.pack("<I", len(value)) + value
+
+def fbx_name(name, class_name):
+    # Object names carry their class after a \x00\x01 separator
+    return fbx_str(name.encode() + b"\x00\x01" + class_name.encode())
+
+def fbx_array(array):
+    # Typed array property, zlib compressed once it is worth it
+    array = np.ascontiguousarray(array)
+    code = {"f8": b"d", "f4": b"f", "i4": b"i", "i8": b"l", "b1": b"b"}[array.dtype.str[1:]]
+    data = array.tobytes()
+    encoding = 0
+    if len(data) > 128:
+        data = zlib.compress(data, 1)
+        encoding = 1
+    return code + struct.pack("<3I", array.size, encoding, len(data)) + data
+
+class MeshArrays:
+    """Evaluated geometry of a mesh object in the flat layout FBX stores it in"""
+    __slots__ = ("vertices", "polygon_vertex_index", "normals", "uv_layers", "material_indices", "triangle_count")
+
+    def __init__(self, vertices, polygon_vertex_index, normals, uv_layers, material_indices, triangle_count):
+        self.vertices = vertices
+        self.polygon_vertex_index = polygon_vertex_index
+        self.normals = normals
+        self.uv_layers = uv_layers
+        self.material_indices = material_indices
+        self.triangle_count = triangle_count
+
+    @property
+    def nbytes(self):
+        size = self.vertices.nbytes + self.polygon_vertex_index.nbytes + self.normals.nbytes + self.material_indices.nbytes
+        for _, uv, uv_index in self.uv_layers:
+            size += uv.nbytes + uv_index.nbytes
+        return size
+
+def read_mesh_arrays(obj, depsgraph):
+    # Pull the evaluated mesh of an object out in bulk with foreach_get
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vertices)
+
+        polygon_vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", polygon_vertex_index)
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+        # FBX marks the last corner of every polygon by storing it as -(index + 1)
+        ends = loop_starts + loop_totals - 1
+        polygon_vertex_index[ends] = ~polygon_vertex_index[ends]
+
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        if hasattr(mesh, "corner_normals"):
+            mesh.corner_normals.foreach_get("vector", normals)
+        else:
+            mesh.calc_normals_split()
+            mesh.loops.foreach_get("normal", normals)
+
+        uv_layers = []
+        for uv_layer in mesh.uv_layers:
+            uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+            uv_layer.data.foreach_get("uv", uv)
+            # Store every distinct UV once and index it per corner
+            unique_uv, uv_index = np.unique(uv.reshape(-1, 2), axis=0, return_inverse=True)
+            uv_layers.append((uv_layer.name, unique_uv.astype(np.float64), uv_index.astype(np.int32).ravel()))
+
+        material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", material_indices)
+
+        return MeshArrays(
+            vertices.astype(np.float64),
+            polygon_vertex_index,
+            normals.astype(np.float64),
+            uv_layers,
+            material_indices,
+            int(np.maximum(loop_totals - 2, 0).sum()),
+        )
+    finally:
+        obj_eval.to_mesh_clear()
+
+class EvaluatedMeshCache:
+    """Evaluated meshes read through the depsgraph once per batch export and shared by
+    every collection containing the object, dropped least recently used first"""
+
+    def __init__(self, limit_mb):
+        self.limit = limit_mb * 1024 * 1024
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(obj):
+        # Linked duplicates without modifiers evaluate to the same geometry
+        if not obj.modifiers and obj.data.shape_keys is None:
+            return ("MESH", obj.data.name_full)
+        return ("OBJECT", obj.name_full)
+
+    def get(self, obj, depsgraph):
+        key = self.key(obj)
+        arrays = self.entries.get(key)
+        if arrays is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return arrays
+
+        self.misses += 1
+        arrays = read_mesh_arrays(obj, depsgraph)
+        # A mesh bigger than the whole cache is used once and not kept
+        if arrays.nbytes <= self.limit:
+            self.entries[key] = arrays
+            self.nbytes += arrays.nbytes
+            while self.nbytes > self.limit:
+                _, evicted = self.entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return arrays
+
+    def discard(self, obj):
+        arrays = self.entries.pop(self.key(obj), None)
+        if arrays is not None:
+            self.nbytes -= arrays.nbytes
+
+    def summary(self):
+        return f"Mesh cache: {self.hits} hits, {self.misses} misses, {self.nbytes / (1024 * 1024):.1f} MB held"
+
+def make_mesh_cache(settings):
+    # Shared mesh cache of one batch export, None when it is turned off
+    return EvaluatedMeshCache(settings.mesh_cache_mb) if settings.mesh_cache_mb > 0 else None
+
+def read_cached_mesh_arrays(obj, depsgraph, cache=None):
+    if cache is None:
+        return read_mesh_arrays(obj, depsgraph)
+    return cache.get(obj, depsgraph)
+
+def find_base_color_texture(material):
+    # Image node feeding the Base Color of the Principled BSDF, None without one
+    for node in material.node_tree.nodes:
+        if node.type != 'BSDF_PRINCIPLED':
+            continue
+        for link in node.inputs["Base Color"].links:
+            if link.from_node.type == 'TEX_IMAGE' and link.from_node.image is not None:
+                return link.from_node
+    return None
+
+def fast_writer_supports_material(material):
+    # Plain colours and a single base colour texture are written, anything else
+    # (normal maps, extra image nodes, ...) is left to the regular exporter
+    if not material.use_nodes or material.node_tree is None:
+        return True
+    images = [node for node in material.node_tree.nodes if node.type == 'TEX_IMAGE']
+    if not images:
+        return True
+    return len(images) == 1 and find_base_color_texture(material) is images[0]
+
+def fast_writer_supports(objects):
+    # Only unparented, unanimated static meshes take the fast path
+    names = {obj.name for obj in objects}
+    if not names:
+        return False
+    for obj in objects:
+        if obj.type != 'MESH':
+            return False
+        if obj.parent is not None and obj.parent.name in names:
+            return False
+        if obj.animation_data is not None and obj.animation_data.action is not None:
+            return False
+        if obj.data.shape_keys is not None:
+            return False
+        if any(modifier.type == 'ARMATURE' for modifier in obj.modifiers):
+            return False
+        for slot in obj.material_slots:
+            if slot.material is None or not fast_writer_supports_material(slot.material):
+                return False
+    return True
+
+def fbx_global_matrix(scene):
+    # Same space as the FBX exporter's defaults: -Z forward, Y up, unit scale applied to objects
+    scale = 1.0 if scene.unit_settings.system == 'NONE' else 100.0 * scene.unit_settings.scale_length
+    return Matrix.Scale(scale, 4) @ axis_conversion(to_forward='-Z', to_up='Y').to_4x4()
+
+def add_fbx_header(root):
+    # Header, file id and global settings every FBX 7.4 file starts with
+    header = root.add("FBXHeaderExtension")
+    header.add("FBXHeaderVersion", fbx_i32(1003))
+    header.add("FBXVersion", fbx_i32(FBX_VERSION))
+    header.add("EncryptionType", fbx_i32(0))
+    now = time.localtime()
+    stamp = header.add("CreationTimeStamp")
+    stamp.add("Version", fbx_i32(1000))
+    for name, value in (("Year", now.tm_year), ("Month", now.tm_mon), ("Day", now.tm_mday),
+                        ("Hour", now.tm_hour), ("Minute", now.tm_min), ("Second", now.tm_sec), ("Millisecond", 0)):
+        stamp.add(name, fbx_i32(value))
+    header.add("Creator", fbx_str(FBX_CREATOR))
+
+    root.add("FileId", fbx_raw(FBX_FILE_ID))
+    root.add("CreationTime", fbx_str(FBX_CREATION_TIME))
+    root.add("Creator", fbx_str(FBX_CREATOR))
+
+    settings = root.add("GlobalSettings")
+    settings.add("Version", fbx_i32(1000))
+    props = settings.add("Properties70")
+    for name, value in (("UpAxis", 1), ("UpAxisSign", 1), ("FrontAxis", 2), ("FrontAxisSign", 1),
+                        ("CoordAxis", 0), ("CoordAxisSign", 1), ("OriginalUpAxis", 2), ("OriginalUpAxisSign", 1)):
+        props.add_property(name, "int", "Integer", "", fbx_i32(value))
+    props.add_property("UnitScaleFactor", "double", "Number", "", fbx_f64(1.0))
+    props.add_property("OriginalUnitScaleFactor", "double", "Number", "", fbx_f64(1.0))
+
+    documents = root.add("Documents")
+    documents.add("Count", fbx_i32(1))
+    document = documents.add("Document", fbx_i64(FBX_DOCUMENT_ID), fbx_str("Scene"), fbx_str("Scene"))
+    document.add("Properties70")
+    document.add("RootNode", fbx_i64(0))
+    root.add("References")
+
+def add_fbx_geometry(objects_node, geometry_id, name, arrays, has_materials):
+    geometry = objects_node.add("Geometry", fbx_i64(geometry_id), fbx_name(name, "Geometry"), fbx_str("Mesh"))
+    geometry.add("Properties70")
+    geometry.add("GeometryVersion", fbx_i32(124))
+    geometry.add("Vertices", fbx_array(arrays.vertices))
+    geometry.add("PolygonVertexIndex", fbx_array(arrays.polygon_vertex_index))
+
+    normals = geometry.add("LayerElementNormal", fbx_i32(0))
+    normals.add("Version", fbx_i32(101))
+    normals.add("Name", fbx_str(""))
+    normals.add("MappingInformationType", fbx_str("ByPolygonVertex"))
+    normals.add("ReferenceInformationType", fbx_str("Direct"))
+    normals.add("Normals", fbx_array(arrays.normals))
+
+    for index, (uv_name, uv, uv_index) in enumerate(arrays.uv_layers):
+        uv_node = geometry.add("LayerElementUV", fbx_i32(index))
+        uv_node.add("Version", fbx_i32(101))
+        uv_node.add("Name", fbx_str(uv_name))
+        uv_node.add("MappingInformationType", fbx_str("ByPolygonVertex"))
+        uv_node.add("ReferenceInformationType", fbx_str("IndexToDirect"))
+        uv_node.add("UV", fbx_array(uv.ravel()))
+        uv_node.add("UVIndex", fbx_array(uv_index))
+
+    if has_materials:
+        materials = geometry.add("LayerElementMaterial", fbx_i32(0))
+        materials.add("Version", fbx_i32(101))
+        materials.add("Name", fbx_str(""))
+        materials.add("MappingInformationType", fbx_str("ByPolygon"))
+        materials.add("ReferenceInformationType", fbx_str("IndexToDirect"))
+        materials.add("Materials", fbx_array(arrays.material_indices))
+
+    # Layer 0 holds normals, materials and the first UV map, further UV maps get their own layer
+    layer_count = max(1, len(arrays.uv_layers))
+    for index in range(layer_count):
+        layer = geometry.add("Layer", fbx_i32(index))
+        layer.add("Version", fbx_i32(100))
+        element_types = ["LayerElementUV"] if index < len(arrays.uv_layers) else []
+        if index == 0:
+            element_types.insert(0, "LayerElementNormal")
+            if has_materials:
+                element_types.append("LayerElementMaterial")
+        for element_type in element_types:
+            element = layer.add("LayerElement")
+            element.add("Type", fbx_str(element_type))
+            element.add("TypedIndex", fbx_i32(index if element_type == "LayerElementUV" else 0))
+
+def add_fbx_model(objects_node, model_id, name, matrix):
+    location, rotation, scale = matrix.decompose()
+    euler = rotation.to_euler('XYZ')
+    model = objects_node.add("Model", fbx_i64(model_id), fbx_name(name, "Model"), fbx_str("Mesh"))
+    model.add("Version", fbx_i32(232))
+    props = model.add("Properties70")
+    props.add_property("Lcl Translation", "Lcl Translation", "", "A", *map(fbx_f64, location))
+    props.add_property("Lcl Rotation", "Lcl Rotation", "", "A", *(fbx_f64(math.degrees(angle)) for angle in euler))
+    props.add_property("Lcl Scaling", "Lcl Scaling", "", "A", *map(fbx_f64, scale))
+    props.add_property("DefaultAttributeIndex", "int", "Integer", "", fbx_i32(0))
+    props.add_property("InheritType", "enum", "", "", fbx_i32(1))
+    model.add("MultiLayer", fbx_i32(0))
+    model.add("MultiTake", fbx_i32(0))
+    model.add("Shading", fbx_bool(True))
+    model.add("Culling", fbx_str("CullingOff"))
+
+def add_fbx_material(objects_node, material_id, material):
+    color = material.diffuse_color
+    if material.use_nodes and material.node_tree is not None:
+        for node in material.node_tree.nodes:
+            if node.type == 'BSDF_PRINCIPLED':
+                color = node.inputs["Base Color"].default_value
+                break
+    node = objects_node.add("Material", fbx_i64(material_id), fbx_name(material.name, "Material"), fbx_str(""))
+    node.add("Version", fbx_i32(102))
+    node.add("ShadingModel", fbx_str("Phong"))
+    node.add("MultiLayer", fbx_i32(0))
+    props = node.add("Properties70")
+    props.add_property("DiffuseColor", "Color", "", "A", *(fbx_f64(c) for c in color[:3]))
+    props.add_property("Opacity", "double", "Number", "", fbx_f64(color[3]))
+
+def add_fbx_texture(objects_node, texture_id, video_id, image, file_path):
+    # Texture and video nodes pointing at the image file, as the exporter does with path mode Auto
+    image_path = os.path.normpath(bpy.path.abspath(image.filepath, library=image.library))
+    try:
+        relative_path = os.path.relpath(image_path, os.path.dirname(file_path))
+    except ValueError:
+        relative_path = image_path
+
+    video = objects_node.add("Video", fbx_i64(video_id), fbx_name(image.name, "Video"), fbx_str("Clip"))
+    video.add("Type", fbx_str("Clip"))
+    video.add("Properties70").add_property("Path", "KString", "XRefUrl", "", fbx_str(image_path))
+    video.add("UseMipMap", fbx_i32(0))
+    video.add("Filename", fbx_str(image_path))
+    video.add("RelativeFilename", fbx_str(relative_path))
+
+    texture = objects_node.add("Texture", fbx_i64(texture_id), fbx_name(image.name, "Texture"), fbx_str(""))
+    texture.add("Type", fbx_str("TextureVideoClip"))
+    texture.add("Version", fbx_i32(202))
+    texture.add("TextureName", fbx_name(image.name, "Texture"))
+    texture.add("Media", fbx_name(image.name, "Video"))
+    texture.add("FileName", fbx_str(image_path))
+    texture.add("RelativeFilename", fbx_str(relative_path))
+    texture.add("ModelUVTranslation", fbx_f64(0.0), fbx_f64(0.0))
+    texture.add("ModelUVScaling", fbx_f64(1.0), fbx_f64(1.0))
+    texture.add("Texture_Alpha_Source", fbx_str("None"))
+    texture.add("Cropping", fbx_i32(0), fbx_i32(0), fbx_i32(0), fbx_i32(0))
+
+def write_static_mesh_fbx(objects, file_path, depsgraph, cache=None):
+    # Write static mesh objects straight to a binary FBX 7.4 file, reading
+    # their evaluated meshes through the shared cache when there is one
+    ids = itertools.count(FBX_FIRST_ID)
+    root = FBXNode("")
+    add_fbx_header(root)
+    objects_node = FBXNode("Objects")
+    connections = FBXNode("Connections")
+    global_matrix = fbx_global_matrix(depsgraph.scene)
+
+    def connect(kind, child_id, parent_id, *props):
+        connections.add("C", fbx_str(kind), fbx_i64(child_id), fbx_i64(parent_id), *props)
+
+    counts = {"Model": 0, "Geometry": 0, "Material": 0, "Texture": 0, "Video": 0}
+    material_ids = {}
+    for obj in objects:
+        arrays = read_cached_mesh_arrays(obj, depsgraph, cache)
+        geometry_id = next(ids)
+        model_id = next(ids)
+        add_fbx_geometry(objects_node, geometry_id, obj.data.name, arrays, bool(obj.material_slots))
+        add_fbx_model(objects_node, model_id, obj.name, global_matrix @ obj.matrix_world)
+        connect("OO", geometry_id, model_id)
+        connect("OO", model_id, 0)
+        counts["Model"] += 1
+        counts["Geometry"] += 1
+
+        # Material indices refer to the order the materials are connected to the model
+        for slot in obj.material_slots:
+            material = slot.material
+            if material.name_full not in material_ids:
+                material_id = next(ids)
+                material_ids[material.name_full] = material_id
+                add_fbx_material(objects_node, material_id, material)
+                counts["Material"] += 1
+                texture_node = find_base_color_texture(material) if material.use_nodes else None
+                if texture_node is not None:
+                    texture_id = next(ids)
+                    video_id = next(ids)
+                    add_fbx_texture(objects_node, texture_id, video_id, texture_node.image, file_path)
+                    connect("OO", video_id, texture_id)
+                    connect("OP", texture_id, material_id, fbx_str("DiffuseColor"))
+                    counts["Texture"] += 1
+                    counts["Video"] += 1
+            connect("OO", material_ids[material.name_full], model_id)
+
+    definitions = root.add("Definitions")
+    definitions.add("Version", fbx_i32(100))
+    definitions.add("Count", fbx_i32(1 + sum(counts.values())))
+    definitions.add("ObjectType", fbx_str("GlobalSettings")).add("Count", fbx_i32(1))
+    for object_type, count in counts.items():
+        if count:
+            definitions.add("ObjectType", fbx_str(object_type)).add("Count", fbx_i32(count))
+
+    root.children.append(objects_node)
+    root.children.append(connections)
+    root.add("Takes").add("Current", fbx_str(""))
+
+    temp_path = partial_path(file_path)
+    with open(temp_path, "wb") as f:
+        f.write(FBX_HEADER_MAGIC)
+        f.write(struct.pack("<I", FBX_VERSION))
+        root.write_children(f, False)
+        # Footer, padded to a 16 byte boundary
+        f.write(FBX_FOOTER_ID)
+        f.write(b"\0" * 4)
+        offset = f.tell()
+        padding = ((offset + 15) & ~15) - offset
+        f.write(b"\0" * (padding or 16))
+        f.write(struct.pack("<I", FBX_VERSION))
+        f.write(b"\0" * 120)
+        f.write(FBX_FOOTER_MAGIC)
+    os.replace(temp_path, file_path)
+
+class FastMeshExporter:
+    """Write collections made of plain static meshes with write_static_mesh_fbx and
+    hand every other collection to the regular exporter"""
+
+    def __init__(self, fallback, cache=None):
+        self.fallback = fallback
+        self.cache = cache
+        self.fast_count = 0
+
+    def export(self, collection, folder_path, timings=None):
+        objects = list(collection_export_objects(collection))
+        if not fast_writer_supports(objects):
+            self.fallback.export(collection, folder_path, timings)
+            return
+
+        file_path = collection_fbx_path(collection, folder_path)
+        start = time.perf_counter()
+        write_static_mesh_fbx(objects, file_path, bpy.context.evaluated_depsgraph_get(), self.cache)
+        add_timing(timings, "export", start)
+        flush_file(file_path, timings)
+        self.fast_count += 1
+
+    def restore(self):
+        self.fallback.restore()
+        if self.cache is not None:
+            print(self.cache.summary())
+
+def draw_call_count(objects):
+    # One draw call per mesh object and material it uses
+    count = 0
+    for obj in objects:
+        if obj.type == 'MESH':
+            count += max(1, len({slot.material for slot in obj.material_slots if slot.material is not None}))
+    return count
+
+def group_objects_for_merge(objects):
+    # Split objects into groups of static meshes sharing one material and the objects kept as they are
+    names = {obj.name for obj in objects}
+    groups = {}
+    kept = []
+    for obj in objects:
+        materials = {slot.material for slot in obj.material_slots}
+        static = (
+            obj.type == 'MESH'
+            and not obj.children
+            and (obj.parent is None or obj.parent.name not in names)
+            and (obj.animation_data is None or obj.animation_data.action is None)
+            and obj.data.shape_keys is None
+            and not any(modifier.type == 'ARMATURE' for modifier in obj.modifiers)
+            # Mirrored objects would need their winding flipped
+            and obj.matrix_world.determinant() > 0
+            and len(materials) <= 1
+        )
+        if static:
+            groups.setdefault(next(iter(materials), None), []).append(obj)
+        else:
+            kept.append(obj)
+
+    # A material used by a single object has nothing to merge with
+    for material, members in list(groups.items()):
+        if len(members) < 2:
+            kept.extend(members)
+            del groups[material]
+    return groups, kept
+
+def build_merged_mesh(name, objects, material, depsgraph, cache=None):
+    # Join the evaluated meshes of objects into one world space mesh, with the
+    # vertex, corner and polygon buffers concatenated in bulk
+    positions, corners, totals, normals, uvs = [], [], [], [], []
+    vertex_offset = 0
+    for obj in objects:
+        arrays = read_cached_mesh_arrays(obj, depsgraph, cache)
+        matrix = np.array(obj.matrix_world)
+        positions.append(arrays.vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])
+
+        # Decode the FBX corner layout back into vertex indices and polygon sizes
+        index = arrays.polygon_vertex_index
+        ends = np.flatnonzero(index < 0)
+        corners.append(np.where(index < 0, ~index, index) + vertex_offset)
+        totals.append(np.diff(np.concatenate(([-1], ends))))
+
+        corner_normals = arrays.normals.reshape(-1, 3) @ np.linalg.inv(matrix[:3, :3])
+        lengths = np.linalg.norm(corner_normals, axis=1, keepdims=True)
+        normals.append(corner_normals / np.maximum(lengths, 1e-12))
+
+        if arrays.uv_layers:
+            _, uv, uv_index = arrays.uv_layers[0]
+            uvs.append(uv[uv_index])
+        else:
+            uvs.append(np.zeros((len(index), 2)))
+        vertex_offset += len(positions[-1])
+
+    positions = np.concatenate(positions)
+    corners = np.concatenate(corners).astype(np.int32)
+    totals = np.concatenate(totals).astype(np.int32)
+    starts = (np.cumsum(totals) - totals).astype(np.int32)
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set("co", positions.astype(np.float32).ravel())
+    mesh.loops.add(len(corners))
+    mesh.loops.foreach_set("vertex_index", corners)
+    mesh.polygons.add(len(totals))
+    mesh.polygons.foreach_set("loop_start", starts)
+    mesh.polygons.foreach_set("loop_total", totals)
+    mesh.polygons.foreach_set("use_smooth", np.ones(len(totals), dtype=bool))
+    mesh.update(calc_edges=True)
+
+    uv_layer = mesh.uv_layers.new(name="UVMap")
+    uv_layer.data.foreach_set("uv", np.concatenate(uvs).astype(np.float32).ravel())
+    # Keep the shading of the source objects through custom normals
+    if hasattr(mesh, "use_auto_smooth"):
+        mesh.use_auto_smooth = True
+    mesh.normals_split_custom_set(np.concatenate(normals).astype(np.float32))
+    if material is not None:
+        mesh.materials.append(material)
+    return mesh
+
+class MergeByMaterialExporter:
+    """Export each collection with its static meshes joined per material. The
+    joined meshes are temporary copies, the scene itself is left untouched."""
+
+    def __init__(self, settings, cache=None):
+        self.settings = settings
+        self.cache = cache
+
+    def export(self, collection, folder_path, timings=None):
+        objects = list(collection_export_objects(collection))
+        groups, kept = group_objects_for_merge(objects)
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+
+        temp_collection = bpy.data.collections.new("batch_export_merge")
+        bpy.context.scene.collection.children.link(temp_collection)
+        merged = []
+        try:
+            for material, members in groups.items():
+                name = f"{collection.name}_{material.name if material else 'no_material'}_merged"
+                mesh = build_merged_mesh(name, members, material, depsgraph, self.cache)
+                merged_object = bpy.data.objects.new(name, mesh)
+                temp_collection.objects.link(merged_object)
+                merged.append(merged_object)
+            export_objects(kept + merged, collection_fbx_path(collection, folder_path), self.settings, timings,
+                           self.cache)
+        finally:
+            for merged_object in merged:
+                # Merged meshes belong to this collection only, keep them out of the cache
+                if self.cache is not None:
+                    self.cache.discard(merged_object)
+                mesh = merged_object.data
+                bpy.data.objects.remove(merged_object)
+                bpy.data.meshes.remove(mesh)
+            bpy.data.collections.remove(temp_collection)
+
+        return {"draw_calls_before": draw_call_count(objects), "draw_calls_after": draw_call_count(kept) + len(merged)}
+
+    def restore(self):
+        if self.cache is not None:
+            print(self.cache.summary())
+
+def parse_lod_ratios(text):
+    # Triangle ratios of the LOD levels, LOD0 first
+    try:
+        ratios = [float(value) for value in text.replace(";", ",").split(",") if value.strip()]
+    except ValueError:
+        raise ValueError(f"LOD ratios must be numbers separated by commas, got '{text}'")
+    if not ratios or any(not 0.0 < ratio <= 1.0 for ratio in ratios):
+        raise ValueError("LOD ratios must lie between 0 and 1")
+    return ratios
+
+def lod_file_path(collection, folder_path, level):
+    return os.path.join(folder_path, f"{collection.name}_LOD{level}.fbx")
+
+class LODExporter:
+    """Export a chain of LOD levels per collection. Every level is made of
+    temporary copies of the mesh objects carrying an extra Decimate modifier."""
+
+    def __init__(self, settings):
+        self.settings = settings
+
+    def make_level(self, objects, level, ratio, temp_collection):
+        # Copies of the mesh objects for one LOD level, other objects are kept as they are
+        level_objects = []
+        copies = []
+        for obj in objects:
+            if obj.type != 'MESH' or (ratio >= 1.0 and self.settings.lod_layout == 'FILES'):
+                level_objects.append(obj)
+                continue
+            copy = obj.copy()
+            copy.name = f"{obj.name}_LOD{level}"
+            copy.parent = None
+            copy.matrix_world = obj.matrix_world
+            if ratio < 1.0:
+                copy.modifiers.new("batch_export_lod", 'DECIMATE').ratio = ratio
+            temp_collection.objects.link(copy)
+            level_objects.append(copy)
+            copies.append(copy)
+        return level_objects, copies
+
+    def export(self, collection, folder_path, timings=None):
+        ratios = parse_lod_ratios(self.settings.lod_ratios)
+        objects = list(collection_export_objects(collection))
+        temp_collection = bpy.data.collections.new("batch_export_lod")
+        bpy.context.scene.collection.children.link(temp_collection)
+        copies = []
+        lod_triangles = []
+        try:
+            levels = []
+            for level, ratio in enumerate(ratios):
+                level_objects, level_copies = self.make_level(objects, level, ratio, temp_collection)
+                levels.append(level_objects)
+                copies.extend(level_copies)
+
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            for level_objects in levels:
+                lod_triangles.append(sum(mesh_triangle_count(obj.evaluated_get(depsgraph).data)
+                                         for obj in level_objects if obj.type == 'MESH'))
+
+            if self.settings.lod_layout == 'GROUP':
+                # One file, objects named <object>_LOD<n> as game engines expect for LOD groups
+                grouped = [obj for obj in objects if obj.type != 'MESH']
+                for level_objects in levels:
+                    grouped.extend(obj for obj in level_objects if obj.type == 'MESH')
+                file_path = collection_fbx_path(collection, folder_path)
+                export_objects(grouped, file_path, self.settings, timings)
+            else:
+                for level, level_objects in enumerate(levels):
+                    export_objects(level_objects, lod_file_path(collection, folder_path, level), self.settings, timings)
+                file_path = lod_file_path(collection, folder_path, 0)
+        finally:
+            for copy in copies:
+                bpy.data.objects.remove(copy)
+            bpy.data.collections.remove(temp_collection)
+
+        return {"file": file_path, "lod_triangles": lod_triangles}
+
+    def restore(self):
+        pass
+
+def make_collection_exporter(settings, instance_files=None, interactive=False):
+    # Pick the export path for the settings, every exporter has export() and restore().
+    # Interactive exports give the selection back after every collection.
+    if settings.use_instancing:
+        return InstancingExporter(instance_files or {})
+    if settings.use_merge_by_material:
+        return MergeByMaterialExporter(settings, make_mesh_cache(settings))
+    if settings.use_lods:
+        return LODExporter(settings)
+    exporter = SelectionFreeExporter(interactive) if settings.use_selection_free else SelectionExporter()
+    if settings.use_fast_writer:
+        return FastMeshExporter(exporter, make_mesh_cache(settings))
+    return exporter
+
+def export_collections(collections, folder_path, settings, instance_files=None, queue=None, archive=None):
+    # Export collections one after another in this process, checkpointing the queue
+    # and handing the written files to the archive after each
+    if settings.use_instancing and instance_files is None:
+        instance_files, _ = export_instance_meshes(collections, folder_path, settings.instance_match)
+    exporter = make_collection_exporter(settings, instance_files)
+    results = []
+    try:
+        for collection in collections:
+            if queue is not None:
+                queue.wait_before_retry(collection.name, settings.retry_backoff)
+            result = export_collection_with_result(collection, folder_path, exporter.export)
+            results.append(result)
+            if queue is not None:
+                queue.record(result)
+            if archive is not None:
+                archive.record(result)
+    finally:
+        exporter.restore()
+    return results
+
+def run_export(collections, folder_path, settings, instance_files=None, queue=None, archive=None):
+    # Export in worker processes or in this process, depending on the settings.
+    # Worker results reach the queue and the archive as soon as their worker exits.
+    if settings.use_parallel and len(collections) > 1:
+        # Workers export side by side, one wait covers the longest backoff of the retried collections
+        if queue is not None:
+            time.sleep(max(queue.retry_delay(collection.name, settings.retry_backoff) for collection in collections))
+
+        def record(result):
+            if queue is not None:
+                queue.record(result)
+            if archive is not None:
+                archive.record(result)
+
+        return export_collections_parallel(collections, folder_path, settings.worker_count, instance_files, record)
+    return export_collections(collections, folder_path, settings, instance_files, queue, archive)
+
+class ExportQueue:
+    """Pending, done and failed collections of a batch export, stored in the export
+    folder and rewritten atomically after every collection"""
+
+    def __init__(self, folder_path, jobs):
+        self.path = os.path.join(folder_path, QUEUE_NAME)
+        self.jobs = jobs
+
+    @classmethod
+    def create(cls, folder_path, names):
+        queue = cls(folder_path, {name: {"status": "pending", "attempts": 0, "error": ""} for name in names})
+        queue.save()
+        return queue
+
+    @classmethod
+    def load(cls, folder_path):
+        try:
+            with open(os.path.join(folder_path, QUEUE_NAME)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != QUEUE_VERSION:
+            return None
+        return cls(folder_path, data["jobs"])
+
+    def save(self):
+        # Write next to the old queue and swap, a crash leaves either the old or the new one
+        with open(self.path + ".tmp", "w") as f:
+            json.dump({"version": QUEUE_VERSION, "jobs": self.jobs}, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.path + ".tmp", self.path)
+
+    def record(self, result):
+        job = self.jobs.setdefault(result["collection"], {"status": "pending", "attempts": 0, "error": ""})
+        job["attempts"] += 1
+        job["status"] = "done" if result["ok"] else "failed"
+        job["error"] = result["error"]
+        self.save()
+
+    def remaining(self, max_retries):
+        # Pending collections plus failed ones that still have retries left
+        return [name for name, job in self.jobs.items()
+                if job["status"] == "pending" or (job["status"] == "failed" and job["attempts"] <= max_retries)]
+
+    def retry_delay(self, name, backoff):
+        # Exponential backoff before exporting a collection that failed before, 0 for the others
+        job = self.jobs.get(name)
+        if job is not None and job["status"] == "failed":
+            return backoff * 2 ** (job["attempts"] - 1)
+        return 0.0
+
+    def wait_before_retry(self, name, backoff):
+        time.sleep(self.retry_delay(name, backoff))
+
+class ExportArchive:
+    """Zip archive the exported files are streamed into. Every file is its own deflate
+    member, so one collection can be read back without decompressing the others."""
+
+    def __init__(self, folder_path, name):
+        self.path = os.path.join(folder_path, bpy.path.clean_name(name or "batch_export") + ".zip")
+        self.staging_path = tempfile.mkdtemp(prefix=".archive_", dir=folder_path)
+        self.zip = zipfile.ZipFile(partial_path(self.path), "w", zipfile.ZIP_DEFLATED, allowZip64=True)
+        # Zip members can only be written one at a time, a single background
+        # thread compresses them while the main thread exports the next collection
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch_export_archive")
+        self.lock = threading.Lock()
+        self.futures = []
+        self.queued = set()
+        self.members = []
+
+    @staticmethod
+    def result_files(result):
+        # Files the export of one collection wrote: its FBX, the further LOD levels
+        # of the one file per level layout and its instance table
+        file_path = result["file"]
+        folder_path, name = os.path.dirname(file_path), result["collection"]
+        file_paths = [file_path, os.path.join(folder_path, f"{name}.instances.json")]
+        if file_path.endswith("_LOD0.fbx"):
+            file_paths.extend(os.path.join(folder_path, f"{name}_LOD{level}.fbx")
+                              for level in range(1, len(result.get("lod_triangles", []))))
+        return [path for path in file_paths if os.path.isfile(path)]
+
+    def record(self, result):
+        # Queue the files of a finished collection. Parallel workers share the staging
+        # folder, so only the result's own files are taken, never a sweep of the folder.
+        for file_path in self.result_files(result):
+            member = self.queue_member(file_path, result["collection"])
+            # The loose file is gone once it is archived, keep its size for the report
+            if member is not None and file_path == result["file"]:
+                result["bytes"] = member["bytes"]
+
+    def queue_member(self, file_path, collection):
+        file_path = os.path.normpath(file_path)
+        if file_path in self.queued:
+            return None
+        self.queued.add(file_path)
+        member = {
+            "collection": collection,
+            "name": os.path.relpath(file_path, self.staging_path).replace(os.sep, "/"),
+            "bytes": os.path.getsize(file_path),
+        }
+        self.futures.append(self.pool.submit(self.add_member, file_path, member))
+        return member
+
+    def record_shared(self):
+        # Files no collection claimed, like the meshes folder of shared instance meshes.
+        # Only called once every export has finished, nothing is still being written.
+        for root, _, files in os.walk(self.staging_path):
+            for file_name in sorted(files):
+                if not file_name.startswith(".partial_"):
+                    self.queue_member(os.path.join(root, file_name), ARCHIVE_SHARED_COLLECTION)
+
+    def add_member(self, file_path, member):
+        self.zip.write(file_path, member["name"])
+        info = self.zip.getinfo(member["name"])
+        member["compressed_bytes"] = info.compress_size
+        member["crc32"] = info.CRC
+        with self.lock:
+            self.members.append(member)
+        os.remove(file_path)
+
+    def close(self):
+        # Wait for the pending members, add the manifest and move the archive in place.
+        # Only for a completed export, an interrupted one is dropped with abort().
+        try:
+            self.record_shared()
+            for future in self.futures:
+                future.result()
+            members = sorted(self.members, key=lambda m: m["name"])
+            manifest = {
+                "version": ARCHIVE_VERSION,
+                "collections": sorted({member["collection"] for member in members} - {ARCHIVE_SHARED_COLLECTION}),
+                "members": members,
+            }
+            self.zip.writestr(ARCHIVE_MANIFEST_NAME, json.dumps(manifest, indent=1))
+            self.zip.close()
+            os.replace(partial_path(self.path), self.path)
+        finally:
+            self.cleanup()
+
+    def abort(self):
+        # Drop the partial archive, the archive of an earlier complete export stays as it was
+        for future in self.futures:
+            future.cancel()
+        self.cleanup()
+
+    def cleanup(self):
+        self.pool.shutdown()
+        self.zip.close()
+        shutil.rmtree(self.staging_path, ignore_errors=True)
+        if os.path.exists(partial_path(self.path)):
+            os.remove(partial_path(self.path))
+
+def export_objects(objects, file_path, settings, timings=None, cache=None):
+    # Export a list of objects, through the fast writer when it is enabled and can take them
+    if settings.use_fast_writer and fast_writer_supports(objects):
+        start = time.perf_counter()
+        write_static_mesh_fbx(objects, file_path, bpy.context.evaluated_depsgraph_get(), cache)
+        add_timing(timings, "export", start)
+        flush_file(file_path, timings)
+    else:
+        export_objects_as_fbx(objects, file_path, timings)
+
+def object_world_bounds(objects):
+    # World space bounding boxes of many objects at once, as (mins, maxs) arrays
+    corners = np.ones((len(objects), 8, 4))
+    matrices = np.empty((len(objects), 4, 4))
+    for index, obj in enumerate(objects):
+        corners[index, :, :3] = obj.bound_box
+        matrices[index] = obj.matrix_world
+    world = np.einsum("nij,nkj->nki", matrices, corners)[:, :, :3]
+    return world.min(axis=1), world.max(axis=1)
+
+def partition_objects_into_cells(objects, cell_size, rule):
+    # Uniform grid over the ground plane. Every object lands in exactly one cell,
+    # chosen from its bounds so that the same scene always gives the same split.
+    mins, maxs = object_world_bounds(objects)
+    anchors = (mins + maxs) / 2 if rule == 'CENTER' else mins
+    cell_indices = np.floor(anchors[:, :2] / cell_size).astype(np.int64)
+
+    cells = {}
+    for index, (x, y) in enumerate(cell_indices.tolist()):
+        cells.setdefault((x, y), []).append(index)
+    return cells, mins, maxs
+
+def export_grid_cells(collection, folder_path, settings):
+    # Export every non-empty grid cell of a collection and write the cell index next to them
+    objects = list(collection.all_objects)
+    results = []
+    if not objects:
+        return results
+
+    cell_size = settings.grid_cell_size
+    cells, mins, maxs = partition_objects_into_cells(objects, cell_size, settings.grid_straddle_rule)
+    index = {
+        "collection": collection.name,
+        "cell_size": cell_size,
+        "rule": settings.grid_straddle_rule,
+        "space": "Blender world space, Z up, meters",
+        "cells": [],
+    }
+
+    for (x, y), members in sorted(cells.items()):
+        file_name = f"{collection.name}_{x}_{y}.fbx"
+        result = {
+            "collection": f"{collection.name} [{x}, {y}]",
+            "file": os.path.join(folder_path, file_name),
+            "ok": True,
+            "error": "",
+            "seconds": 0.0,
+        }
+        start = time.perf_counter()
+        try:
+            export_objects([objects[i] for i in members], result["file"], settings)
+        except Exception as e:
+            result["ok"] = False
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        results.append(result)
+
+        # Cell bounds are what the game streams by, content bounds include
+        # the parts of straddling objects that reach into neighbouring cells
+        index["cells"].append({
+            "file": file_name,
+            "cell": [x, y],
+            "cell_bounds": [[x * cell_size, y * cell_size], [(x + 1) * cell_size, (y + 1) * cell_size]],
+            "content_bounds": [mins[members].min(axis=0).tolist(), maxs[members].max(axis=0).tolist()],
+            "objects": [objects[i].name for i in members],
+        })
+
+    with open(os.path.join(folder_path, f"{collection.name}_grid.json"), "w") as f:
+        json.dump(index, f, indent=1)
+    return results
+
+def export_collection_with_result(collection, folder_path, export=export_collection_as_fbx):
+    # Export a collection and describe the outcome as a plain dict,
+    # so results from worker processes can be merged with local ones
+    result = {
+        "collection": collection.name,
+        "file": collection_fbx_path(collection, folder_path),
+        "ok": True,
+        "error": "",
+        "seconds": 0.0,
+    }
+    start = time.perf_counter()
+    try:
+        # Exporters may hand back extra numbers for the report
+        result.update(export(collection, folder_path) or {})
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+def split_between_workers(collections, worker_count):
+    # Greedily hand the biggest collections out first, always to the least
+    # loaded worker, so every worker ends up with a similar amount of objects
+    shares = [[] for _ in range(worker_count)]
+    loads = [0] * worker_count
+    for collection in sorted(collections, key=lambda c: len(c.all_objects), reverse=True):
+        index = loads.index(min(loads))
+        shares[index].append(collection.name)
+        loads[index] += max(1, len(collection.all_objects))
+    return [share for share in shares if share]
+
+def export_collections_parallel(collections, folder_path, worker_count, instance_files=None, on_result=None):
+    # Save a snapshot of the current file and let background Blender
+    # processes export their share of the collections from it. on_result
+    # gets every result as soon as the worker that made it has exited.
+    shares = split_between_workers(collections, max(1, min(worker_count, len(collections))))
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="batch_export_") as temp_dir:
+        snapshot_path = os.path.join(temp_dir, "snapshot.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=snapshot_path, copy=True)
+
+        workers = []
+        for index, share in enumerate(shares):
+            job_path = os.path.join(temp_dir, f"job_{index}.json")
+            result_path = os.path.join(temp_dir, f"result_{index}.json")
+            log_path = os.path.join(temp_dir, f"worker_{index}.log")
+            with open(job_path, "w") as f:
+                json.dump({
+                    "folder": folder_path,
+                    "collections": share,
+                    "instances": instance_files,
+                    "results": result_path,
+                }, f)
+
+            command = [
+                bpy.app.binary_path, "-b", "--factory-startup", snapshot_path,
+                "--python-exit-code", "1",
+                "--python", os.path.abspath(__file__),
+                "--", WORKER_FLAG, job_path,
+            ]
+            log = open(log_path, "w")
+            process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+            workers.append((process, log, share, result_path, log_path))
+
+        # Poll the workers and merge what each wrote as soon as it exits
+        while workers:
+            finished = [worker for worker in workers if worker[0].poll() is not None]
+            if not finished:
+                time.sleep(0.1)
+                continue
+            for worker in finished:
+                workers.remove(worker)
+                worker_results = read_worker_results(*worker, folder_path)
+                results.extend(worker_results)
+                if on_result is not None:
+                    for result in worker_results:
+                        on_result(result)
+
+    return results
+
+def read_worker_results(process, log, share, result_path, log_path, folder_path):
+    # Results a finished worker wrote, or a failure for each of its collections when it wrote none
+    log.close()
+    if os.path.exists(result_path):
+        with open(result_path) as f:
+            return json.load(f)
+
+    # The worker died before writing anything, blame all of its collections
+    with open(log_path) as f:
+        tail = f.read().strip().splitlines()[-1:]
+    error = tail[0] if tail else f"worker exited with code {process.returncode}"
+    return [{
+        "collection": name,
+        "file": os.path.join(folder_path, f"{name}.fbx"),
+        "ok": False,
+        "error": error,
+        "seconds": 0.0,
+    } for name in share]
+
+def run_export_worker(job_path):
+    # Entry point of a background worker, exports the collections listed in the job file
+    with open(job_path) as f:
+        job = json.load(f)
+
+    results = []
+    collections = []
+    for name in job["collections"]:
+        collection = bpy.data.collections.get(name)
+        if collection is None:
+            results.append({
+                "collection": name,
+                "file": os.path.join(job["folder"], f"{name}.fbx"),
+                "ok": False,
+                "error": "collection not found in snapshot",
+                "seconds": 0.0,
+            })
+            continue
+        collections.append(collection)
+
+    # The snapshot carries the export settings of the scene it was saved from
+    settings = bpy.context.scene.batch_export_settings
+    results.extend(export_collections(collections, job["folder"], settings, job.get("instances")))
+
+    with open(job["results"], "w") as f:
+        json.dump(results, f)
+
+def plain_value(value):
+    # Turn RNA values (arrays, datablocks) into something with a stable repr
+    if hasattr(value, "name") and hasattr(value, "bl_rna"):
+        return value.name
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return tuple(plain_value(item) for item in value)
+    return value
+
+def hash_rna_properties(datablock, digest):
+    # Feed every simple RNA property of a datablock (e.g. a modifier) into the digest
+    for prop in datablock.bl_rna.properties:
+        if prop.identifier == "rna_type" or prop.type == 'COLLECTION':
+            continue
+        value = getattr(datablock, prop.identifier, None)
+        digest.update(f"{prop.identifier}={plain_value(value)!r};".encode())
+
+def hash_mesh(mesh, digest):
+    # Feed the geometry, shading, normals and attributes of a mesh into the digest
+    # with bulk foreach_get reads
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    loops = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loops)
+    totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", totals)
+    material_indices = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_indices)
+    for array in (co, loops, totals, material_indices):
+        digest.update(array.tobytes())
+
+    for uv_layer in mesh.uv_layers:
+        uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        digest.update(uv_layer.name.encode())
+        digest.update(uv.tobytes())
+
+    # Shading: smooth faces and sharp edges are attributes in newer Blender, read them directly for older ones
+    smooth = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("use_smooth", smooth)
+    sharp = np.empty(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("use_edge_sharp", sharp)
+    digest.update(smooth.tobytes())
+    digest.update(sharp.tobytes())
+    digest.update(f"{getattr(mesh, 'use_auto_smooth', '')}:{getattr(mesh, 'auto_smooth_angle', '')}".encode())
+
+    # Custom split normals
+    if mesh.has_custom_normals:
+        if hasattr(mesh, "corner_normals"):
+            normals = np.empty(len(mesh.corner_normals) * 3, dtype=np.float32)
+            mesh.corner_normals.foreach_get("vector", normals)
+        else:
+            mesh.calc_normals_split()
+            normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+            mesh.loops.foreach_get("normal", normals)
+        digest.update(normals.tobytes())
+
+    # Color attributes and every other exported attribute, internal ones like .select_vert left out
+    for attribute in sorted(mesh.attributes, key=lambda a: a.name):
+        if attribute.name.startswith("."):
+            continue
+        digest.update(f"{attribute.name}:{attribute.domain}:{attribute.data_type}".encode())
+        layout = ATTRIBUTE_LAYOUTS.get(attribute.data_type)
+        if layout is None:
+            continue
+        key, components, dtype = layout
+        values = np.empty(len(attribute.data) * components, dtype=dtype)
+        attribute.data.foreach_get(key, values)
+        digest.update(values.tobytes())
+
+def hash_material(material, digest):
+    # Feed the settings and node graph of a material into the digest
+    digest.update(material.name.encode())
+    if not material.use_nodes or material.node_tree is None:
+        digest.update(repr(tuple(material.diffuse_color)).encode())
+        return
+
+    for node in material.node_tree.nodes:
+        digest.update(f"{node.bl_idname}:{node.name}".encode())
+        image = getattr(node, "image", None)
+        if image is not None:
+            digest.update(image.filepath.encode())
+        for socket in node.inputs:
+            if hasattr(socket, "default_value"):
+                digest.update(repr(plain_value(socket.default_value)).encode())
+    for link in material.node_tree.links:
+        digest.update(f"{link.from_node.name}.{link.from_socket.identifier}>{link.to_node.name}.{link.to_socket.identifier}".encode())
+
+def export_settings_key(settings):
+    # The output deciding settings as text, part of every fingerprint
+    return ";".join(f"{name}={getattr(settings, name)!r}" for name in FINGERPRINT_SETTINGS)
+
+def collection_fingerprint(collection, mesh_digests, settings_key=""):
+    # Cheap content hash of everything the exporter writes for a collection.
+    # Meshes shared by several objects or collections are only hashed once.
+    digest = hashlib.sha1()
+    digest.update(settings_key.encode())
+    for obj in sorted(collection_export_objects(collection), key=lambda o: o.name):
+        digest.update(f"{obj.name}:{obj.type}:{obj.parent.name if obj.parent else ''}".encode())
+        digest.update(np.array(obj.matrix_world, dtype=np.float32).tobytes())
+
+        if obj.type == 'MESH':
+            if obj.data.name not in mesh_digests:
+                mesh_digest = hashlib.sha1()
+                hash_mesh(obj.data, mesh_digest)
+                mesh_digests[obj.data.name] = mesh_digest.digest()
+            digest.update(mesh_digests[obj.data.name])
+        elif obj.data is not None:
+            hash_rna_properties(obj.data, digest)
+
+        for modifier in obj.modifiers:
+            hash_rna_properties(modifier, digest)
+        for slot in obj.material_slots:
+            if slot.material is not None:
+                hash_material(slot.material, digest)
+            else:
+                digest.update(b"<empty slot>")
+    return digest.hexdigest()
+
+def load_export_manifest(folder_path):
+    # Read the fingerprints of the last export, a missing or outdated manifest counts as empty
+    try:
+        with open(os.path.join(folder_path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("collections", {})
+
+def save_export_manifest(folder_path, manifest):
+    # Write the manifest next to the exported files, replacing the old one in one step
+    manifest_path = os.path.join(folder_path, MANIFEST_NAME)
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "collections": manifest}, f, indent=1, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def collection_fingerprints(collections, settings):
+    # Fingerprints of collections exported with settings, by collection name
+    mesh_digests = {}
+    settings_key = export_settings_key(settings)
+    return {collection.name: collection_fingerprint(collection, mesh_digests, settings_key) for collection in collections}
+
+def filter_stale_collections(collections, folder_path, settings):
+    # Split off the collections that need exporting, together with the
+    # manifest and fingerprints needed to record them afterwards
+    manifest = load_export_manifest(folder_path)
+    fingerprints = collection_fingerprints(collections, settings)
+    stale = [collection for collection in collections
+             if collection_is_stale(collection, folder_path, manifest, fingerprints[collection.name], settings)]
+    return stale, manifest, fingerprints
+
+def update_export_manifest(folder_path, manifest, fingerprints, results):
+    # Record the fingerprints of the collections that were exported successfully
+    for result in results:
+        if result["ok"]:
+            manifest[result["collection"]] = fingerprints[result["collection"]]
+    save_export_manifest(folder_path, manifest)
+
+def collection_output_paths(collection, folder_path, settings):
+    # Files an export of collection writes with settings, one per LOD level for the file layout
+    # Instancing and merging take precedence over LODs, see make_collection_exporter
+    uses_lods = settings.use_lods and not (settings.use_instancing or settings.use_merge_by_material)
+    if uses_lods and settings.lod_layout == 'FILES':
+        ratios = parse_lod_ratios(settings.lod_ratios)
+        return [lod_file_path(collection, folder_path, level) for level in range(len(ratios))]
+    return [collection_fbx_path(collection, folder_path)]
+
+def collection_is_stale(collection, folder_path, manifest, fingerprint, settings):
+    # A collection needs exporting when its content changed or any of its files is gone
+    if manifest.get(collection.name) != fingerprint:
+        return True
+    try:
+        file_paths = collection_output_paths(collection, folder_path, settings)
+    except ValueError:
+        # Invalid LOD ratios, let the export report them
+        return True
+    return not all(os.path.exists(file_path) for file_path in file_paths)
+
+def mesh_triangle_count(mesh):
+    # Triangles of a mesh from its polygon sizes, read in bulk
+    totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", totals)
+    return int(np.maximum(totals - 2, 0).sum())
+
+def collection_metrics(collection, depsgraph, triangle_counts):
+    # Objects, evaluated triangles, materials and textures a collection writes.
+    # Triangle counts are cached per object for objects in several collections.
+    objects = collection_export_objects(collection)
+    triangles = 0
+    materials = set()
+    for obj in objects:
+        if obj.type == 'MESH':
+            if obj.name not in triangle_counts:
+                triangle_counts[obj.name] = mesh_triangle_count(obj.evaluated_get(depsgraph).data)
+            triangles += triangle_counts[obj.name]
+        materials.update(slot.material for slot in obj.material_slots if slot.material is not None)
+
+    images = set()
+    for material in materials:
+        if material.use_nodes and material.node_tree is not None:
+            images.update(node.image for node in material.node_tree.nodes
+                          if node.type == 'TEX_IMAGE' and node.image is not None)
+    return {"objects": len(objects), "triangles": triangles, "materials": len(materials), "textures": len(images)}
+
+def image_header_size(f):
+    # Width and height from the header of a PNG, JPEG, TGA or BMP file without decoding
+    # the pixels, None for other formats
+    head = f.read(26)
+    if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+        return struct.unpack(">II", head[16:24])
+    if head[:2] == b"BM" and len(head) >= 26:
+        width, height = struct.unpack("<ii", head[18:26])
+        return width, abs(height)
+    if head[:2] == b"\xff\xd8":
+        # Walk the JPEG segments up to the first start of frame
+        f.seek(2)
+        while True:
+            marker = f.read(4)
+            if len(marker) < 4 or marker[0] != 0xFF:
+                return None
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                frame = f.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+            f.seek(struct.unpack(">H", marker[2:4])[0] - 2, 1)
+    if f.name.lower().endswith(".tga") and len(head) >= 16:
+        return struct.unpack("<HH", head[12:16])
+    return None
+
+def image_memory_bytes(image):
+    # Uncompressed size of an image in memory and whether it is exact. Images without
+    # loaded pixels are estimated from their file header as 8 bit RGBA, reading
+    # image.size would load them. None when the size can't be told without loading.
+    if image.has_data:
+        width, height = image.size
+        return width * height * image.channels * (4 if image.is_float else 1), True
+    if image.source != 'FILE' or image.packed_file is not None or not image.filepath:
+        return None, False
+    try:
+        with open(bpy.path.abspath(image.filepath, library=image.library), "rb") as f:
+            size = image_header_size(f)
+    except OSError:
+        return None, False
+    return (size[0] * size[1] * 4 if size is not None else None), False
+
+def collection_budget_usage(collection, depsgraph, object_counts, image_bytes):
+    # Evaluated triangles and vertices plus texture memory of a collection.
+    # Objects and images shared between collections are only measured once.
+    triangles = 0
+    vertices = 0
+    images = set()
+    for obj in collection_export_objects(collection):
+        if obj.type == 'MESH':
+            if obj.name not in object_counts:
+                mesh = obj.evaluated_get(depsgraph).data
+                object_counts[obj.name] = (mesh_triangle_count(mesh), len(mesh.vertices))
+            triangles += object_counts[obj.name][0]
+            vertices += object_counts[obj.name][1]
+        for slot in obj.material_slots:
+            material = slot.material
+            if material is not None and material.use_nodes and material.node_tree is not None:
+                images.update(node.image for node in material.node_tree.nodes
+                              if node.type == 'TEX_IMAGE' and node.image is not None)
+
+    texture_bytes = 0
+    estimated = 0
+    for image in images:
+        if image.name_full not in image_bytes:
+            image_bytes[image.name_full] = image_memory_bytes(image)
+        size, exact = image_bytes[image.name_full]
+        texture_bytes += size or 0
+        estimated += not exact
+    return {"triangles": triangles, "vertices": vertices, "texture_mb": texture_bytes / (1024 * 1024),
+            "texture_estimated": estimated}
+
+def find_collections_over_budget(operator, context, collections, settings):
+    # Names of the collections exceeding a budget, each one is reported with what it exceeds
+    depsgraph = context.evaluated_depsgraph_get()
+    object_counts = {}
+    image_bytes = {}
+    budgets = (
+        ("triangles", settings.budget_triangles),
+        ("vertices", settings.budget_vertices),
+        ("texture_mb", settings.budget_texture_mb),
+    )
+    over = []
+    for collection in collections:
+        usage = collection_budget_usage(collection, depsgraph, object_counts, image_bytes)
+        exceeded = [f"{key} {usage[key]:,.0f}/{limit:,.0f}" for key, limit in budgets if limit and usage[key] > limit]
+        if exceeded:
+            over.append(collection.name)
+            estimate = " (texture memory partly estimated)" if usage["texture_estimated"] else ""
+            operator.report({'WARNING'}, f"{collection.name} over budget: {', '.join(exceeded)}{estimate}")
+
+    # Textures not loaded yet are not decoded for the check
+    estimated = sum(1 for size, exact in image_bytes.values() if not exact and size is not None)
+    unknown = sum(1 for size, _ in image_bytes.values() if size is None)
+    if estimated or unknown:
+        operator.report({'INFO'}, f"Texture memory of {estimated} images estimated from file headers, "
+                                  f"{unknown} images of unknown size not counted")
+    return over
+
+def apply_budgets(operator, context, collections, settings):
+    # Pre-flight before an export, drops the collections over budget when blocking
+    if not settings.use_budgets:
+        return collections
+    over = set(find_collections_over_budget(operator, context, collections, settings))
+    if settings.budget_action == 'BLOCK' and over:
+        operator.report({'WARNING'}, f"{len(over)} collections over budget are not exported")
+        return [collection for collection in collections if collection.name not in over]
+    return collections
+
+def record_export_report(context, results, folder_path):
+    # Add metrics to the export results, write them to the export folder and show them in the panel
+    depsgraph = context.evaluated_depsgraph_get()
+    triangle_counts = {}
+    rows = []
+    for result in results:
+        collection = bpy.data.collections.get(result["collection"])
+        metrics = collection_metrics(collection, depsgraph, triangle_counts) if collection is not None else {
+            "objects": 0, "triangles": 0, "materials": 0, "textures": 0}
+        row = dict(result, **metrics)
+        if result["ok"] and os.path.exists(result["file"]):
+            row["bytes"] = os.path.getsize(result["file"])
+        else:
+            # Archived files only leave their size behind
+            row["bytes"] = result.get("bytes", 0) if result["ok"] else 0
+        rows.append({field: row.get(field, "") for field in REPORT_FIELDS})
+
+    with open(os.path.join(folder_path, REPORT_NAME + ".json"), "w") as f:
+        json.dump(rows, f, indent=1)
+    with open(os.path.join(folder_path, REPORT_NAME + ".csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    report = context.scene.batch_export_report
+    report.clear()
+    for row in rows:
+        item = report.add()
+        item.name = row["collection"]
+        item.ok = row["ok"]
+        item.seconds = row["seconds"]
+        item.objects = row["objects"]
+        item.triangles = row["triangles"]
+        item.materials = row["materials"]
+        item.textures = row["textures"]
+        item.size_mb = row["bytes"] / (1024 * 1024)
+    return rows
+
+def redraw_view3d(context):
+    # Make the sidebar panels show the latest progress
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+def report_results(operator, results, elapsed, skipped=0):
+    # Print the merged result of a batch export and summarize it in the UI
+    failed = [result for result in results if not result["ok"]]
+    for result in sorted(results, key=lambda r: r["collection"]):
+        status = "OK" if result["ok"] else f"FAILED: {result['error']}"
+        print(f"{result['collection']}: {result['seconds']:.2f}s {status}")
+        if result.get("lod_triangles"):
+            levels = ", ".join(f"LOD{level} {count:,}" for level, count in enumerate(result["lod_triangles"]))
+            print(f"    triangles: {levels}")
+
+    for result in failed:
+        operator.report({'WARNING'}, f"{result['collection']}: {result['error']}")
+    message = f"Exported {len(results) - len(failed)}/{len(results)} collections in {elapsed:.1f}s"
+    if skipped:
+        message += f", {skipped} unchanged skipped"
+    if any("draw_calls_before" in result for result in results):
+        before = sum(result.get("draw_calls_before", 0) for result in results)
+        after = sum(result.get("draw_calls_after", 0) for result in results)
+        message += f", draw calls {before} -> {after}"
+    operator.report({'INFO'}, message)
 
 classes = (
+    BatchExportReportItem,
     BatchExportSettings,
     BatchExportOperator,
+    BatchExportModalOperator,
+    BatchExportResumeOperator,
+    BatchExportGridOperator,
+    BatchExportCheckBudgetsOperator,
+    BatchExportCheckScopeOperator,
     BatchExportPanel,
+    BATCHEXPORT_UL_report,
 )
 
 def register():
@@ -89,12 +2532,20 @@ def register():
         bpy.utils.register_class(cls)
 
     bpy.types.Scene.batch_export_settings = bpy.props.PointerProperty(type=BatchExportSettings)
+    bpy.types.Scene.batch_export_report = bpy.props.CollectionProperty(type=BatchExportReportItem)
+    bpy.types.Scene.batch_export_report_index = bpy.props.IntProperty()
 
 def unregister():
     for cls in classes:
         bpy.utils.unregister_class(cls)
 
     del bpy.types.Scene.batch_export_settings
+    del bpy.types.Scene.batch_export_report
+    del bpy.types.Scene.batch_export_report_index
 
 if __name__ == "__main__":
     register()
+
+    # Started by export_collections_parallel as a background worker
+    if WORKER_FLAG in sys.argv:
+        run_export_worker(sys.argv[sys.argv.index(WORKER_FLAG) + 1])